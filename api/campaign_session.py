@@ -115,6 +115,7 @@ class CampaignSession:
             raise ValueError("Not in fight")
         boss_id = CAMPAIGN_BOSS_ORDER[self.boss_index]
         self.log.append(f"Week {self.week}: Resigned fight against {boss_id.capitalize()}. Advancing to Week {self.week + 1}.")
+        self.current_fight.map.end_fight()
         self.week += 1
         self.boss_index = 0
         self.week_party = []
@@ -229,6 +229,8 @@ class GameSession:
         elif not heroes_alive:
             self.phase = 'game_over'
             self.log_messages.append("Defeat. All heroes have fallen.")
+        if self.phase == 'game_over':
+            self.map.end_fight()
 
     def action_restart_round(self):
         """Restore game state to start of current round."""
@@ -109,11 +109,12 @@ def serialize_map(game_map, heroes):
     for y in range(game_map.height):
         row = []
         for x in range(game_map.width):
-            contents = game_map.cell_contents[y][x]
-            figures_in_cell = [serialize_figure(f, game_map) for f in contents]
+            index = y * game_map.width + x
+            figures_in_cell = [serialize_figure(f, game_map) for f in game_map.cells[index]]
             row.append({
                 'x': x, 'y': y,
                 'figures': figures_in_cell,
+                'hazard': game_map.cell_hazards[index],
             })
         cells.append(row)
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for EventManager in events.py.
+
+Run with:  python bench_events.py
+"""
+
+import timeit
+import uuid
+
+from events import EventManager
+from game_events import GameEvent
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class LegacyEventManager:
+    """The pre-handle EventManager: uuid ids, string keys, deregister rebuilds the list. Kept for comparison."""
+    def __init__(self):
+        self.listeners = {}
+
+    def _normalize_event_name(self, event_name):
+        if isinstance(event_name, GameEvent):
+            return event_name.value
+        return event_name
+
+    def register(self, event_name, callback):
+        normalized_name = self._normalize_event_name(event_name)
+        listener_id = uuid.uuid4()
+        self.listeners.setdefault(normalized_name, []).append((listener_id, callback))
+        return listener_id
+
+    def deregister(self, event_name, listener_id):
+        normalized_name = self._normalize_event_name(event_name)
+        if normalized_name in self.listeners:
+            self.listeners[normalized_name] = [
+                (lid, cb) for (lid, cb) in self.listeners[normalized_name] if lid != listener_id
+            ]
+
+    def trigger(self, event_name, *args, **kwargs):
+        normalized_name = self._normalize_event_name(event_name)
+        for _, callback in self.listeners.get(normalized_name, []):
+            callback(*args, **kwargs)
+
+
+def noop(*args, **kwargs):
+    pass
+
+
+def time_call(fn, repeat=5):
+    """Best-of-N wall time of a single call, in milliseconds."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_trigger(listener_counts=(0, 1, 5, 20), triggers=100_000):
+    """Triggers per second for one event with N no-op listeners, by enum and by string name."""
+    print(f"trigger: {triggers} triggers of one event (best of 5, ms)")
+    print(f"  {'listeners':>9} {'legacy':>9} {'new':>9} {'speedup':>8} {'new(str)':>9}")
+    for listener_count in listener_counts:
+        timings = []
+        for manager_class in (LegacyEventManager, EventManager):
+            manager = manager_class()
+            for _ in range(listener_count):
+                manager.register(GameEvent.DAMAGE_TAKEN, noop)
+            manager.register(GameEvent.HERO_TURN_START, noop)  # an unrelated event
+            trigger = manager.trigger
+            timings.append(time_call(lambda: [trigger(GameEvent.DAMAGE_TAKEN, None, 1) for _ in range(triggers)]))
+        trigger = manager.trigger
+        by_name = time_call(lambda: [trigger("damage_taken", None, 1) for _ in range(triggers)])
+        print(f"  {listener_count:>9} {timings[0]:>9.1f} {timings[1]:>9.1f} {timings[0] / timings[1]:>7.1f}x {by_name:>9.1f}")
+
+
+def bench_churn(resident_counts=(10, 100, 1000), cycles=10_000):
+    """
+    Round-style churn: register a temporary listener, trigger the event, deregister it, next to
+    N long-lived listeners on other events (the register_temporary_listener / schedule_callback pattern).
+    """
+    print(f"churn: {cycles} register/trigger/deregister cycles (best of 5, ms)")
+    print(f"  {'resident':>9} {'legacy':>9} {'new':>9} {'speedup':>8}")
+    events = list(GameEvent)
+    for resident_count in resident_counts:
+        timings = []
+        for manager_class in (LegacyEventManager, EventManager):
+            manager = manager_class()
+            for i in range(resident_count):
+                manager.register(events[i % len(events)], noop)
+
+            def cycle():
+                for _ in range(cycles):
+                    listener_id = manager.register(GameEvent.HERO_TURN_END, noop)
+                    manager.trigger(GameEvent.HERO_TURN_END)
+                    manager.deregister(GameEvent.HERO_TURN_END, listener_id)
+            timings.append(time_call(cycle))
+        print(f"  {resident_count:>9} {timings[0]:>9.1f} {timings[1]:>9.1f} {timings[0] / timings[1]:>7.1f}x")
+
+
+def bench_keyed_dispatch(figure_counts=(4, 20, 100, 400), triggers=20_000):
+    """
+    DAMAGE_TAKEN on one figure with a per-figure listener for each of N figures plus three global
+    listeners: every listener filtering on its own figure vs listeners keyed by subject figure.
+    """
+    print(f"keyed: {triggers} DAMAGE_TAKEN triggers, one per-figure listener per figure (best of 5, ms)")
+    print(f"  {'figures':>9} {'filtering':>10} {'keyed':>9} {'speedup':>8}")
+    for figure_count in figure_counts:
+        figures = [object() for _ in range(figure_count)]
+        timings = []
+        for keyed in (False, True):
+            manager = EventManager()
+            for _ in range(3):
+                manager.register(GameEvent.DAMAGE_TAKEN, noop)
+            for figure in figures:
+                if keyed:
+                    manager.register(GameEvent.DAMAGE_TAKEN, noop, figure=figure)
+                else:
+                    def listener(figure, damage_taken, damage_source, own=figure):
+                        if figure is not own:
+                            return
+                    manager.register(GameEvent.DAMAGE_TAKEN, listener)
+            trigger = manager.trigger
+            targets = [figures[i % figure_count] for i in range(triggers)]
+            timings.append(time_call(lambda: [trigger(GameEvent.DAMAGE_TAKEN, figure=target, damage_taken={}, damage_source=None)
+                                              for target in targets]))
+        print(f"  {figure_count:>9} {timings[0]:>10.1f} {timings[1]:>9.1f} {timings[0] / timings[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    bench_trigger()
+    bench_churn()
+    bench_keyed_dispatch()
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the pathfinding code in map.py.
+
+Run with:  python bench_pathfinding.py
+"""
+
+import contextlib
+import heapq
+import io
+import random
+import timeit
+import tracemalloc
+
+from map import Map, figure_type_mask
+import map as map_module
+from figure import Figure, FigureType
+from coords import Coords
+from encounters.encounter_synthetic import EncounterSynthetic
+from turn_context import TurnContext
+from hierarchical_pathfinding import ClusterHierarchy
+import distance_transforms
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def legacy_fifo_bfs(map, start, impassible_types=None):
+    """The pre-Dijkstra Map.bfs: FIFO queue with list.pop(0), kept here for comparison."""
+    if impassible_types is None:
+        impassible_types = set()
+    visited = {}
+    queue = [(start, 0.0)]
+    while queue:
+        current, cost = queue.pop(0)
+        if current in visited:
+            continue
+        visited[current] = cost
+        for neighbor in map.get_horver_neighbors(current):
+            if neighbor not in visited and not any(f.figure_type in impassible_types for f in map.get_square_contents(neighbor)):
+                queue.append((neighbor, cost + 1))
+        for neighbor in map.get_diag_neighbors(current):
+            can_move, _ = map.can_move_diagonal(current, neighbor, impassible_types)
+            if neighbor not in visited and can_move and not any(f.figure_type in impassible_types for f in map.get_square_contents(neighbor)):
+                queue.append((neighbor, cost + 1.5))
+    return {coord: int(cost) for coord, cost in visited.items()}
+
+
+def legacy_bfs_with_hazards(map, start, impassible_types, max_distance, figure=None):
+    """The pre-parity Map.bfs_with_hazards: (cost, hazard) dominance per square only."""
+    labels = [(start, None)]
+    pareto_paths = {}
+    counter = 0
+    queue = [(0, 0, counter, 0, False)]
+    while queue:
+        hazard, cost, _, label, next_diag_expensive = heapq.heappop(queue)
+        current = labels[label][0]
+        if cost > max_distance:
+            continue
+        existing = pareto_paths.get(current, [])
+        if any(c <= cost and h <= hazard for c, h, _ in existing):
+            continue
+        pareto_paths[current] = [(c, h, l) for c, h, l in existing if not (cost <= c and hazard <= h)] + [(cost, hazard, label)]
+        if cost >= max_distance:
+            continue
+        for neighbor in map.get_horver_neighbors(current):
+            if not any(f.figure_type in impassible_types for f in map.get_square_contents(neighbor)):
+                labels.append((neighbor, label))
+                counter += 1
+                heapq.heappush(queue, (hazard + map._get_hazard_damage(neighbor, figure), cost + 1, counter, len(labels) - 1, next_diag_expensive))
+        for neighbor in map.get_diag_neighbors(current):
+            can_move, crossing_hazard = map.can_move_diagonal(current, neighbor, impassible_types)
+            if can_move and not any(f.figure_type in impassible_types for f in map.get_square_contents(neighbor)):
+                labels.append((neighbor, label))
+                counter += 1
+                new_hazard = hazard + map._get_hazard_damage(neighbor, figure) + crossing_hazard
+                heapq.heappush(queue, (new_hazard, cost + (2 if next_diag_expensive else 1), counter, len(labels) - 1, not next_diag_expensive))
+    return {coord: min(paths)[:2] for coord, paths in pareto_paths.items()}
+
+
+def count_heap_pushes(fn):
+    """Run fn() and return (result, number of heapq.heappush calls it made)."""
+    pushes = 0
+    heappush = heapq.heappush
+
+    def counting_heappush(queue, item):
+        nonlocal pushes
+        pushes += 1
+        heappush(queue, item)
+
+    heapq.heappush = counting_heappush
+    try:
+        return fn(), pushes
+    finally:
+        heapq.heappush = heappush
+
+
+class LegacyCoords:
+    """The pre-flyweight Coords: __dict__ per instance, hash built from a fresh tuple each call."""
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __eq__(self, other):
+        return isinstance(other, LegacyCoords) and self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+
+def legacy_horver_neighbors(map, coords):
+    """The pre-table Map.get_horver_neighbors: four fresh Coords per call, filtered by bounds."""
+    x, y = coords.x, coords.y
+    return [c for c in [Coords(x+1, y), Coords(x-1, y), Coords(x, y+1), Coords(x, y-1)] if map.coords_in_bounds(c)]
+
+
+def legacy_diag_neighbors(map, coords):
+    x, y = coords.x, coords.y
+    return [c for c in [Coords(x+1, y+1), Coords(x-1, y+1), Coords(x+1, y-1), Coords(x-1, y-1)] if map.coords_in_bounds(c)]
+
+
+def count_coords_allocations(fn):
+    """Run fn() and return (result, number of Coords objects constructed meanwhile)."""
+    allocations = 0
+    init = Coords.__init__
+
+    def counting_init(self, x, y):
+        nonlocal allocations
+        allocations += 1
+        init(self, x, y)
+
+    Coords.__init__ = counting_init
+    try:
+        return fn(), allocations
+    finally:
+        Coords.__init__ = init
+
+
+def play_boss_turns(encounter_name, seed, rounds=30):
+    """Seeded game with the heroes standing still; returns the path searches each boss turn ran."""
+    from api.game_session import GameSession
+    random.seed(seed)
+    searches = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        session = GameSession()
+        session.start_simple(encounter_name, ['Warrior', 'Rogue', 'Mage', 'Priest'])
+        for coords in list(session.placement_zone)[:4]:
+            session.action_place_hero(coords.x, coords.y)
+        try:
+            for _ in range(rounds):
+                if not session.map.get_figures_by_type(FigureType.HERO):
+                    break
+                session.controller.pending_interaction = None
+                session.map.end_hero_turn()
+                before = session.map.search_count
+                session.map.execute_boss_turn()
+                searches.append(session.map.search_count - before)
+                session.map.begin_hero_turn()
+        except Exception:
+            pass  # some seeds hit encounter bugs; count the turns played until then
+    return searches
+
+
+def time_call(fn, repeat=5):
+    """Best-of-N wall time of a single call, in milliseconds."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_bfs(sizes=(11, 25, 50, 80)):
+    """Full single-source search from the board centre: legacy FIFO vs Dijkstra."""
+    print("bfs: full search from centre (best of 5, ms)")
+    print(f"  {'board':>9} {'legacy':>10} {'dijkstra':>10} {'speedup':>8} {'mismatches':>11}")
+    impassible = {FigureType.OBSTACLE}
+    for size in sizes:
+        map = Map(EncounterSynthetic(size))
+        start = Coords(size // 2, size // 2)
+        legacy = legacy_fifo_bfs(map, start, impassible)
+        dijkstra = map.bfs(start, impassible)
+        mismatches = sum(1 for c in dijkstra if legacy.get(c) != dijkstra[c])
+        legacy_ms = time_call(lambda: legacy_fifo_bfs(map, start, impassible))
+        dijkstra_ms = time_call(lambda: map.bfs(start, impassible))
+        print(f"  {size:>4}x{size:<4} {legacy_ms:>10.2f} {dijkstra_ms:>10.2f} {legacy_ms / dijkstra_ms:>7.1f}x {mismatches:>11}")
+
+
+def bench_figures_within_distance(minion_count=20, distance=2):
+    """Radius query on an 11x11 board against one search per figure."""
+    rng = random.Random(1)
+    map = Map(EncounterSynthetic(11, obstacle_density=0.05))
+    for _ in range(minion_count):
+        map.add_figure(Figure("Minion", FigureType.MINION), Coords(rng.randrange(11), rng.randrange(11)), on_occupied='find_empty')
+    origin = Coords(5, 5)
+
+    def per_figure():
+        return [f for f in map.figures if map.bfs(origin, target=f.position).get(f.position, float('inf')) <= distance]
+
+    assert per_figure() == map.get_figures_within_distance(origin, distance)
+    per_figure_ms = time_call(per_figure)
+    query_ms = time_call(lambda: map.get_figures_within_distance(origin, distance))
+    print(f"get_figures_within_distance: {len(map.figures)} figures, range {distance} (best of 5, ms)")
+    print(f"  per-figure search {per_figure_ms:.2f}   radius query {query_ms:.3f}   speedup {per_figure_ms / query_ms:.1f}x")
+
+
+def bench_squares_within_distance(sizes=(11, 25, 50, 100, 200), distance=3):
+    """Fixed-radius square query: the traversal should cost the same on any board size."""
+    print(f"get_squares_within_distance: radius {distance} from the centre (best of 5, ms)")
+    print(f"  {'board':>9} {'reached':>8} {'per-square':>11} {'traversal':>10}")
+    impassible = {FigureType.OBSTACLE}
+    for size in sizes:
+        map = Map(EncounterSynthetic(size))
+        origin = Coords(size // 2, size // 2)
+        reached = len(map.get_squares_within_distance(origin, distance, impassible))
+        traversal_ms = time_call(lambda: map.get_squares_within_distance(origin, distance, impassible))
+        if size <= 11:
+            # the old implementation: one targeted search per board square
+            per_square_ms = time_call(lambda: [sq for sq in map.squares if map.bfs(origin, impassible, target=sq).get(sq, float('inf')) <= distance], repeat=1)
+            per_square = f"{per_square_ms:>11.2f}"
+        else:
+            per_square = f"{'-':>11}"
+        print(f"  {size:>4}x{size:<4} {reached:>8} {per_square} {traversal_ms:>10.3f}")
+
+
+def bench_bfs_with_hazards(lava_densities=(0.3, 0.6, 0.9), size=15, max_distance=8):
+    """Hazard-aware search on lava-saturated boards: heap pushes and time, old vs parity-keyed labels."""
+    print(f"bfs_with_hazards: {size}x{size}, move {max_distance}, from the centre (best of 5, ms)")
+    print(f"  {'lava':>5} {'legacy pushes':>14} {'pushes':>8} {'legacy':>9} {'parity':>9} {'worse squares':>14}")
+    impassible = {FigureType.OBSTACLE, FigureType.HERO}
+    for lava_density in lava_densities:
+        map = Map(EncounterSynthetic(size, obstacle_density=0.05, lava_density=lava_density))
+        start = Coords(size // 2, size // 2)
+        legacy, legacy_pushes = count_heap_pushes(lambda: legacy_bfs_with_hazards(map, start, impassible, max_distance))
+        result, pushes = count_heap_pushes(lambda: map.bfs_with_hazards(start, impassible, max_distance))
+        # squares where the old search settled for a more expensive (cost, hazard) than the parity-keyed one
+        worse = sum(1 for c, r in result.items() if legacy.get(c) != (r['move_cost'], r['hazard_damage']))
+        legacy_ms = time_call(lambda: legacy_bfs_with_hazards(map, start, impassible, max_distance))
+        parity_ms = time_call(lambda: map.bfs_with_hazards(start, impassible, max_distance))
+        print(f"  {lava_density:>5.1f} {legacy_pushes:>14} {pushes:>8} {legacy_ms:>9.2f} {parity_ms:>9.2f} {worse:>14}")
+
+
+def bench_neighbor_tables(sizes=(11, 25, 50)):
+    """Coords allocated (and time) by bfs_with_hazards, with per-call neighbour lists vs the precomputed tables."""
+    print("neighbor tables: bfs_with_hazards from centre, range 8 (best of 5, ms)")
+    print(f"  {'board':>9} {'legacy allocs':>14} {'table allocs':>13} {'legacy':>9} {'tables':>9}")
+    impassible = {FigureType.OBSTACLE}
+    for size in sizes:
+        map = Map(EncounterSynthetic(size))
+        start = Coords(size // 2, size // 2)
+        search = lambda: map.bfs_with_hazards(start, impassible, max_distance=8)
+        expected, table_allocs = count_coords_allocations(search)
+        table_ms = time_call(search)
+        # shadow the table lookups with the old allocating versions on this instance only
+        map.get_horver_neighbors = lambda coords: legacy_horver_neighbors(map, coords)
+        map.get_diag_neighbors = lambda coords: legacy_diag_neighbors(map, coords)
+        legacy, legacy_allocs = count_coords_allocations(search)
+        assert legacy == expected
+        legacy_ms = time_call(search)
+        print(f"  {size:>4}x{size:<4} {legacy_allocs:>14} {table_allocs:>13} {legacy_ms:>9.2f} {table_ms:>9.2f}")
+
+
+def bench_coords(size=100, lookups=200_000):
+    """Memory per square and dict-lookup cost for one board's worth of coordinates."""
+    def allocated(cls):
+        tracemalloc.start()
+        squares = [cls(x, y) for y in range(size) for x in range(size)]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return squares, current
+
+    print(f"Coords: {size}x{size} board, {lookups} dict lookups (best of 5, ms)")
+    print(f"  {'':>8} {'bytes/square':>13} {'lookups':>9}")
+    for label, cls in [("legacy", LegacyCoords), ("slotted", Coords)]:
+        squares, memory = allocated(cls)
+        table = {square: i for i, square in enumerate(squares)}
+        # equal-but-distinct keys, as a search sees them when Coords are not interned
+        probes = [cls(square.x, square.y) for square in squares] * (lookups // len(squares))
+        lookup_ms = time_call(lambda: [table[probe] for probe in probes])
+        print(f"  {label:>8} {memory / len(squares):>13.0f} {lookup_ms:>9.2f}")
+    interned = Map(EncounterSynthetic(size, obstacle_density=0)).squares
+    table = {square: i for i, square in enumerate(interned)}
+    probes = interned * (lookups // len(interned))
+    print(f"  {'interned':>8} {'-':>13} {time_call(lambda: [table[probe] for probe in probes]):>9.2f}")
+
+
+def bench_boss_turn_searches(encounters=('sael', 'como', 'across'), seeds=range(3)):
+    """Path searches per boss turn, with and without the shared TurnContext (off: Map gets unshared ones)."""
+    print("boss turns: path searches per turn")
+    print(f"  {'encounter':>9} {'turns':>6} {'unshared':>9} {'shared':>7}")
+    for encounter_name in encounters:
+        totals = {}
+        for sharing in (False, True):
+            if not sharing:
+                map_module.TurnContext = lambda map: TurnContext(map, shared=False)
+            try:
+                totals[sharing] = [n for seed in seeds for n in play_boss_turns(encounter_name, seed)]
+            finally:
+                map_module.TurnContext = TurnContext
+        turns = len(totals[True])
+        print(f"  {encounter_name:>9} {turns:>6} {sum(totals[False]) / len(totals[False]):>9.1f} {sum(totals[True]) / turns:>7.1f}")
+
+
+def bench_point_queries(sizes=(11, 25, 50, 80), pairs=50):
+    """distance_between on a cold cache: A* towards the destination vs building the origin's whole field."""
+    print(f"distance_between, cold cache: {pairs} random pairs per board (squares queued per query, ms per query)")
+    print(f"  {'board':>9} {'field push':>11} {'A* push':>8} {'field ms':>9} {'A* ms':>7}")
+    impassible = {FigureType.OBSTACLE}
+    for size in sizes:
+        map = Map(EncounterSynthetic(size))
+        rng = random.Random(size)
+        # mostly short hops, like adjacency and reach checks
+        queries = []
+        for _ in range(pairs):
+            origin = rng.choice(map.squares)
+            queries.append((origin, Coords(min(size - 1, origin.x + rng.randint(0, 3)), min(size - 1, origin.y + rng.randint(0, 3)))))
+        def run(query):
+            for origin, target in queries:
+                map.distance_cache.clear()
+                query(origin, target, impassible)
+
+        _, field_pushes = count_heap_pushes(lambda: run(map.shared_distance))
+        _, astar_pushes = count_heap_pushes(lambda: run(map.distance_between))
+        field_ms = time_call(lambda: run(map.shared_distance), repeat=3) / pairs
+        astar_ms = time_call(lambda: run(map.distance_between), repeat=3) / pairs
+        print(f"  {size:>4}x{size:<4} {field_pushes / pairs:>11.0f} {astar_pushes / pairs:>8.1f} {field_ms:>9.3f} {astar_ms:>7.3f}")
+
+
+def bench_field_repair(sizes=(11, 25, 50), minion_count=24, origins=4, moves=50):
+    """Cached hero movement fields kept current while minions step around: repair vs recompute."""
+    print(f"distance fields after single-minion moves: {minion_count} minions, {origins} cached fields (ms per move)")
+    print(f"  {'board':>9} {'recompute':>10} {'repair':>8} {'speedup':>8} {'mismatches':>11}")
+    impassible = {FigureType.OBSTACLE, FigureType.BOSS, FigureType.MINION}
+
+    def walk(size):
+        """The same seeded walk whichever way the fields are kept; returns (ms per move, fields after each move)."""
+        map = Map(EncounterSynthetic(size))
+        rng = random.Random(size)
+        minions = []
+        for _ in range(minion_count):
+            minions.append(Figure("Minion", FigureType.MINION))
+            map.add_figure(minions[-1], rng.choice(map.squares), on_occupied='find_empty')
+        sources = [rng.choice(map.squares) for _ in range(origins)]
+        for origin in sources:
+            map.get_distance_field(origin, impassible)
+        history = []
+        elapsed = 0.0
+        for _ in range(moves):
+            minion = rng.choice(minions)
+            open_squares = [square for square in map.get_horver_neighbors(minion.position) + map.get_diag_neighbors(minion.position)
+                            if not map.get_square_contents(square)]
+            if not open_squares:
+                continue
+            square = rng.choice(open_squares)
+            start = timeit.default_timer()
+            with contextlib.redirect_stdout(io.StringIO()):
+                map.move_figure(minion, square)
+            fields = [map.get_distance_field(origin, impassible) for origin in sources]
+            elapsed += timeit.default_timer() - start
+            history.append(fields)
+        return elapsed * 1000 / len(history), history
+
+    for size in sizes:
+        repaired_fields = Map._repaired_fields
+        Map._repaired_fields = lambda map, key: None  # every outdated field is recomputed
+        try:
+            recompute_ms, recomputed = walk(size)
+        finally:
+            Map._repaired_fields = repaired_fields
+        repair_ms, repaired = walk(size)
+        mismatches = sum(1 for a, b in zip(recomputed, repaired) if a != b)
+        print(f"  {size:>4}x{size:<4} {recompute_ms:>10.3f} {repair_ms:>8.3f} {recompute_ms / repair_ms:>7.1f}x {mismatches:>11}")
+
+
+def bench_large_maps(sizes=(11, 50, 100, 200), pairs=40):
+    """Random far-apart queries on walled-room boards: exact searches vs the cluster hierarchy."""
+    print(f"large boards, rooms layout: {pairs} queries between different clusters (ms per query)")
+    print(f"  {'board':>9} {'field':>8} {'A*':>8} {'build':>8} {'cold':>8} {'warm':>8} {'cost ratio':>11}")
+    impassible = {FigureType.OBSTACLE, FigureType.MINION}
+    for size in sizes:
+        map = Map(EncounterSynthetic(size, obstacle_density=0.05, layout='rooms', minion_count=size // 4))
+        hierarchy = ClusterHierarchy(map, impassible, figure_type_mask(impassible))
+        rng = random.Random(size)
+        queries = []
+        while len(queries) < pairs:
+            start, goal = rng.choice(map.squares), rng.choice(map.squares)
+            if hierarchy.cluster_of(start) != hierarchy.cluster_of(goal) and map._astar(start, goal, impassible) is not None:
+                queries.append((start, goal))
+        field_ms = time_call(lambda: map._dijkstra(queries[0][0], impassible, blocked_endpoints=True), repeat=3)
+        astar_ms = time_call(lambda: [map._astar(start, goal, impassible) for start, goal in queries], repeat=3) / pairs
+        build_ms = time_call(hierarchy.rebuild, repeat=3)
+        hierarchy.rebuild()
+        cold_ms = time_call(lambda: [hierarchy.find_path(start, goal) for start, goal in queries], repeat=1) / pairs
+        warm_ms = time_call(lambda: [hierarchy.find_path(start, goal) for start, goal in queries], repeat=3) / pairs
+        ratios = [hierarchy.find_path(start, goal)[0] / map._astar(start, goal, impassible) for start, goal in queries
+                  if hierarchy.find_path(start, goal) is not None]
+        print(f"  {size:>4}x{size:<4} {field_ms:>8.2f} {astar_ms:>8.2f} {build_ms:>8.2f} {cold_ms:>8.2f} {warm_ms:>8.2f} {sum(ratios) / len(ratios):>11.3f}")
+
+
+def bench_range_queries(size=60, distances=(2, 4, 7, 10, 15, 25), repeat=20):
+    """Obstructed range and cone queries: pure-Python searches vs NumPy distance transforms."""
+    if distance_transforms.np is None:
+        print("range/cone queries: NumPy not installed, skipped")
+        return
+    print(f"range/cone queries on a {size}x{size} board with walls and minions (ms per query)")
+    print(f"  {'distance':>8} {'range py':>9} {'range np':>9} {'cone py':>8} {'cone np':>8}")
+    map = Map(EncounterSynthetic(size, minion_count=size))
+    impassible = {FigureType.OBSTACLE, FigureType.MINION}
+    rng = random.Random(size)
+    origins = [(rng.choice(map.squares), rng.choice(map.squares)) for _ in range(repeat)]
+    threshold, numpy = distance_transforms.MIN_WINDOW_CELLS, distance_transforms.np
+    distance_transforms.MIN_WINDOW_CELLS = 0
+    try:
+        for distance in distances:
+            timings = []
+            for query in (lambda origin, target: map.squares_within_distance(origin, impassible, distance),
+                          lambda origin, target: map.squares_within_cone(origin, target, distance, impassible)):
+                for use_numpy in (False, True):
+                    distance_transforms.np = numpy if use_numpy else None  # None: as if NumPy were not installed
+                    timings.append(time_call(lambda: [query(origin, target) for origin, target in origins if origin != target], repeat=3) / repeat)
+            print(f"  {distance:>8} {timings[0]:>9.3f} {timings[1]:>9.3f} {timings[2]:>8.3f} {timings[3]:>8.3f}")
+    finally:
+        distance_transforms.np = numpy
+        distance_transforms.MIN_WINDOW_CELLS = threshold
+
+
+if __name__ == "__main__":
+    bench_bfs()
+    bench_figures_within_distance()
+    bench_squares_within_distance()
+    bench_bfs_with_hazards()
+    bench_neighbor_tables()
+    bench_coords()
+    bench_boss_turn_searches()
+    bench_point_queries()
+    bench_field_repair()
+    bench_large_maps()
+    bench_range_queries()
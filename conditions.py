@@ -70,8 +70,11 @@ def stunned_action_listener(figure):
             ability.used = True
 
 def setup_condition_listeners(map):
-    map.events.register(GameEvent.START_FIGURE_ACTION, condition_turn_start_listener)
-    map.events.register(GameEvent.END_FIGURE_ACTION, condition_turn_end_listener)
-    map.events.register(GameEvent.GET_MOVE, slow_stun_move_listener)
-    map.events.register(GameEvent.DAMAGE_TAKEN, shield_listener)
-    map.events.register(GameEvent.START_FIGURE_ACTION, stunned_action_listener)
\ No newline at end of file
+    # Registered once for the whole fight rather than per figure: shield_listener has to run
+    # before the DAMAGE_TAKEN listeners of heroes, items and cards registered later, whenever
+    # the damaged figure was spawned
+    map.fight_scope.register(GameEvent.START_FIGURE_ACTION, condition_turn_start_listener)
+    map.fight_scope.register(GameEvent.END_FIGURE_ACTION, condition_turn_end_listener)
+    map.fight_scope.register(GameEvent.GET_MOVE, slow_stun_move_listener)
+    map.fight_scope.register(GameEvent.DAMAGE_TAKEN, shield_listener)
+    map.fight_scope.register(GameEvent.START_FIGURE_ACTION, stunned_action_listener)
@@ -1,13 +1,32 @@
 class Coords:
+    """Immutable board square. Maps hand out one shared instance per square (see Map.intern_coords)."""
+    __slots__ = ('x', 'y', '_hash')
+
     def __init__(self, x, y):
-        self.x = x
-        self.y = y
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+        object.__setattr__(self, '_hash', hash((x, y)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Coords is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Coords is immutable")
 
     def __eq__(self, other):
-        return isinstance(other, Coords) and self.x == other.x and self.y == other.y
+        return self is other or (isinstance(other, Coords) and self.x == other.x and self.y == other.y)
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self._hash
 
     def __repr__(self):
-        return f"Coords({self.x}, {self.y})"
\ No newline at end of file
+        return f"Coords({self.x}, {self.y})"
+
+    def __reduce__(self):
+        return (Coords, (self.x, self.y))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
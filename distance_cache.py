@@ -0,0 +1,51 @@
+"""LRU cache of single-source distance fields, validated against the map's version counter."""
+
+from collections import OrderedDict
+
+
+class DistanceFieldCache:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # (origin, frozenset(impassible_types)) -> (version, field)
+        self.hits = 0
+        self.misses = 0
+        self.repairs = 0
+
+    @staticmethod
+    def make_key(origin, impassible_types):
+        return (origin, frozenset(impassible_types) if impassible_types else frozenset())
+
+    def get(self, key, version):
+        """Return the cached field for key if it was computed at this map version, else None."""
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, version, field):
+        self.entries[key] = (version, field)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def replace(self, key, version, field):
+        """Store a repaired field for an existing key, as put does, counting the repair."""
+        self.put(key, version, field)
+        self.repairs += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'repairs': self.repairs,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self.entries),
+            'maxsize': self.maxsize,
+        }
@@ -0,0 +1,82 @@
+"""Incremental repair of cached cost fields when a few squares change blocked status."""
+
+import heapq
+
+
+def repair_cost_field(map, origin, blocking_mask, costs, changed_squares):
+    """
+    Bring a cost field from Map._dijkstra(origin, blocked_endpoints=True) up to date after the
+    squares in changed_squares gained or lost a blocking figure, without searching the whole
+    board again (the dynamic shortest-path repair behind LPA* / D* Lite, run once to completion).
+
+    Costs are updated in place; returns the squares whose cost changed or disappeared.
+
+    Only edges touching the changed squares can appear or vanish: a changed square's own
+    expansion, and the diagonals that cut its corner. So
+      1. squares whose cost is no longer backed by a cheapest neighbour (transitively) are
+         dropped, starting around the changed squares, and
+      2. a Dijkstra pass seeded from the surviving squares bordering the dropped ones and from
+         the changed area re-settles the dropped squares and lowers any cost a new edge improved.
+    """
+    cell_masks = map.cell_masks
+    width = map.width
+
+    def expands(square):
+        return square == origin or not cell_masks[square.y * width + square.x] & blocking_mask
+
+    def edges(square):
+        for neighbor in map.get_horver_neighbors(square):
+            yield neighbor, 1
+        for neighbor in map.get_diag_neighbors(square):
+            if map._diagonal_crossing(square, neighbor, blocking_mask)[0]:
+                yield neighbor, 1.5
+
+    region = set()
+    for square in changed_squares:
+        square = map.intern_coords(square)
+        region.add(square)
+        region.update(map.get_horver_neighbors(square))
+        region.update(map.get_diag_neighbors(square))
+
+    # 1. Drop unsupported costs. Every step along a cheapest path is strictly more expensive,
+    # so squares cannot keep each other alive in a cycle.
+    dropped = set()
+    pending = [square for square in region if square in costs]
+    while pending:
+        square = pending.pop()
+        if square in dropped or square == origin:
+            continue
+        cost = costs[square]
+        if any(neighbor not in dropped and costs.get(neighbor) == cost - step_cost and expands(neighbor)
+               for neighbor, step_cost in edges(square)):
+            continue
+        dropped.add(square)
+        if expands(square):
+            pending.extend(neighbor for neighbor, _ in edges(square) if neighbor in costs and neighbor not in dropped)
+    for square in dropped:
+        del costs[square]
+
+    # 2. Re-settle from the boundary of what was dropped and from the changed area.
+    seeds = {square for square in region if square in costs}
+    for square in dropped:
+        seeds.update(neighbor for neighbor, _ in edges(square) if neighbor in costs)
+    counter = 0
+    queue = []
+    for square in seeds:
+        counter += 1
+        queue.append((costs[square], counter, square))
+    heapq.heapify(queue)
+    changed = set(dropped)
+    while queue:
+        cost, _, current = heapq.heappop(queue)
+        if costs.get(current) != cost or not expands(current):
+            continue
+        for neighbor, step_cost in edges(current):
+            new_cost = cost + step_cost
+            known_cost = costs.get(neighbor)
+            if known_cost is None or new_cost < known_cost:
+                costs[neighbor] = new_cost
+                changed.add(neighbor)
+                counter += 1
+                heapq.heappush(queue, (new_cost, counter, neighbor))
+    return changed
@@ -0,0 +1,156 @@
+"""Range and cone queries as whole-array distance transforms, when NumPy is installed."""
+
+try:
+    import numpy as np
+except ImportError:  # optional: Map keeps answering with its pure-Python searches
+    np = None
+
+# Windows smaller than this (about 20x20) are answered faster by the pure-Python searches
+MIN_WINDOW_CELLS = 400
+
+# (dx, dy, step cost) for the eight moves, in the neighbour order Map uses
+_MOVES = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+          (1, 1, 1.5), (-1, 1, 1.5), (1, -1, 1.5), (-1, -1, 1.5))
+
+
+def available(map, origin, distance):
+    """True when NumPy should answer a range query of this size around an on-board origin."""
+    if np is None or not map.coords_in_bounds(origin):
+        return False
+    side = 2 * int(distance) + 1
+    return min(side, map.width) * min(side, map.height) >= MIN_WINDOW_CELLS
+
+
+def _window(map, origin, distance):
+    """Bounds (x0, y0, x1, y1) of the squares within distance steps of origin, clipped to the board."""
+    distance = int(distance)
+    return (max(0, origin.x - distance), max(0, origin.y - distance),
+            min(map.width, origin.x + distance + 1), min(map.height, origin.y + distance + 1))
+
+
+def _shifted(array, dx, dy):
+    """Slices (source, destination) of array such that destination[i] is source[i] moved by (dx, dy)."""
+    height, width = array.shape
+    source = (slice(max(0, -dy), height - max(0, dy)), slice(max(0, -dx), width - max(0, dx)))
+    destination = (slice(max(0, dy), height - max(0, -dy)), slice(max(0, dx), width - max(0, -dx)))
+    return source, destination
+
+
+def _moves(map, origin, blocking_mask, window, blocked_endpoints=False):
+    """
+    (source, destination, allowed, step cost) per move over a window: which pairs may step, that is
+    the source expands, the destination can be entered, and for diagonals at least one of the two
+    corner squares is open.
+    """
+    x0, y0, x1, y1 = window
+    masks = np.frombuffer(map.cell_masks, dtype=np.uint16).reshape(map.height, map.width)[y0:y1, x0:x1]
+    blocked = (masks & blocking_mask) != 0
+    expands = ~blocked
+    expands[origin.y - y0, origin.x - x0] = True
+    enterable = np.ones_like(blocked) if blocked_endpoints else ~blocked
+
+    moves = []
+    for dx, dy, step_cost in _MOVES:
+        source, destination = _shifted(blocked, dx, dy)
+        allowed = expands[source] & enterable[destination]
+        if dx and dy:
+            # The corners of a diagonal from (x, y) are (x + dx, y) and (x, y + dy)
+            allowed &= ~(blocked[source[0], destination[1]] & blocked[destination[0], source[1]])
+        moves.append((source, destination, allowed, step_cost))
+    return moves
+
+
+def cost_transform(map, origin, blocking_mask, distance, blocked_endpoints=False):
+    """
+    Chamfer distance transform with Map's movement rules (1 per straight step, 1.5 per diagonal,
+    diagonals blocked only when both corners are), over the window of squares that can lie within
+    distance of origin. Returns (x0, y0, costs) with costs[y - y0, x - x0] the unfloored cost of
+    (x, y), or inf. Costs are exact wherever their floor is within distance: the same answer as
+    Map._dijkstra(origin, ..., max_distance=distance, blocked_endpoints=blocked_endpoints).
+
+    Each pass relaxes all eight moves across the whole window at once, updating in place, and
+    passes repeat until nothing changes; every pass extends every path by at least one step and
+    every step costs at least 1, so distance passes settle every square in range.
+    """
+    x0, y0, x1, y1 = _window(map, origin, distance)
+    moves = _moves(map, origin, blocking_mask, (x0, y0, x1, y1), blocked_endpoints)
+    costs = np.full((y1 - y0, x1 - x0), np.inf)
+    costs[origin.y - y0, origin.x - x0] = 0.0
+    for _ in range(int(distance) + 1):
+        before = costs.copy()
+        for source, destination, allowed, step_cost in moves:
+            candidate = np.where(allowed, costs[source] + step_cost, np.inf)
+            np.minimum(costs[destination], candidate, out=costs[destination])
+        if np.array_equal(before, costs):
+            break
+    return x0, y0, costs
+
+
+def _in_range_mask(map, origin, blocking_mask, distance, blocked_endpoints=False):
+    """(x0, y0, mask) of the window squares whose floored cost from origin is within distance."""
+    if not blocking_mask:
+        # Open board: the floored cost is the octile distance
+        x0, y0, x1, y1 = _window(map, origin, distance)
+        dx = np.abs(np.arange(x0, x1) - origin.x)[np.newaxis, :]
+        dy = np.abs(np.arange(y0, y1) - origin.y)[:, np.newaxis]
+        return x0, y0, np.maximum(dx, dy) + np.minimum(dx, dy) // 2 <= int(distance)
+    x0, y0, costs = cost_transform(map, origin, blocking_mask, distance, blocked_endpoints)
+    return x0, y0, np.floor(costs) <= distance
+
+
+def _reach_mask(map, origin, blocking_mask, distance):
+    """
+    (x0, y0, mask) of Map.bfs's reach with max_distance=distance: the squares whose unfloored cost
+    is within distance, plus every square one step beyond them.
+    """
+    if not blocking_mask:
+        # Open board: the squares whose unfloored cost is at most distance + 1.5
+        x0, y0, x1, y1 = _window(map, origin, distance + 1)
+        dx = np.abs(np.arange(x0, x1) - origin.x)[np.newaxis, :]
+        dy = np.abs(np.arange(y0, y1) - origin.y)[:, np.newaxis]
+        return x0, y0, 2 * np.maximum(dx, dy) + np.minimum(dx, dy) <= 2 * distance + 3
+    x0, y0, costs = cost_transform(map, origin, blocking_mask, distance + 1)
+    inner = costs <= distance
+    reach = inner.copy()
+    for source, destination, allowed, _ in _moves(map, origin, blocking_mask, (x0, y0, x0 + costs.shape[1], y0 + costs.shape[0])):
+        reach[destination] |= inner[source] & allowed
+    return x0, y0, reach
+
+
+def _squares(map, x0, y0, mask):
+    """The board's Coords for the True cells of a window mask, in row-major order."""
+    ys, xs = np.nonzero(mask)
+    squares = map.squares
+    width = map.width
+    return [squares[(y + y0) * width + x + x0] for y, x in zip(ys.tolist(), xs.tolist())]
+
+
+def squares_in_range(map, origin, blocking_mask, distance, blocked_endpoints=False):
+    """
+    Squares whose floored cost from origin is within distance, row-major: with blocked_endpoints,
+    Map.get_squares_within_distance.
+    """
+    return _squares(map, *_in_range_mask(map, origin, blocking_mask, distance, blocked_endpoints))
+
+
+def squares_in_reach(map, origin, blocking_mask, distance):
+    """Map.squares_within_distance: the squares bfs records with max_distance=distance, row-major."""
+    return _squares(map, *_reach_mask(map, origin, blocking_mask, distance))
+
+
+def squares_in_cone(map, origin, direction, blocking_mask, distance, angle_threshold):
+    """
+    Map.squares_within_cone: the squares_in_reach squares (origin excluded) whose unit vector from
+    origin has a dot product with the unit vector direction of at least angle_threshold. The
+    arithmetic follows the pure-Python loop operation for operation, so both agree exactly.
+    """
+    x0, y0, in_range = _reach_mask(map, origin, blocking_mask, distance)
+    height, width = in_range.shape
+    v_x = (np.arange(x0, x0 + width) - origin.x)[np.newaxis, :].repeat(height, axis=0)
+    v_y = (np.arange(y0, y0 + height) - origin.y)[:, np.newaxis].repeat(width, axis=1)
+    hypot = np.sqrt(v_x ** 2 + v_y ** 2)
+    hypot[origin.y - y0, origin.x - x0] = 1.0  # origin itself is excluded below
+    dot = direction[0] * (v_x / hypot) + direction[1] * (v_y / hypot)
+    cone = in_range & (dot >= angle_threshold - 1e-9)
+    cone[origin.y - y0, origin.x - x0] = False
+    return _squares(map, x0, y0, cone)
@@ -95,8 +95,9 @@ def across_ignite_arrows(map):
                         print(f"{damage_source.name}'s ignited arrow splashes to {fig.name}!")
                         map.deal_damage(damage_source, fig, physical_damage=0, elemental_damage=1)
     
-    # Register the listener (persists beyond this turn)
-    map.events.register(GameEvent.DAMAGE_TAKEN, ignite_arrows_listener)
+    # Register the listener (persists for the rest of the fight). Each play adds one, so splashes
+    # stack: a marked Stalker's attack splashes once per Ignite Arrows played this fight
+    map.fight_scope.register(GameEvent.DAMAGE_TAKEN, ignite_arrows_listener)
 
 def across_riposte(map):
     """Riposte - Heroes attacking adjacent Blade Storms take 1 physical damage"""
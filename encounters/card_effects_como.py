@@ -3,6 +3,7 @@ from game_targeting import TargetingContext
 from game_events import GameEvent
 from game_conditions import Condition
 from encounters.enemy_ai import choose_target_hero, make_enemy_move
+from turn_context import get_turn_context
 import random
 
 def como_hellfire_listener(figure, damage_taken, **kwargs):
@@ -94,11 +95,9 @@ def como_flames_of_the_pit(map):
     lava_tiles = map.get_figures_by_name("LAVA")
     heroes = map.get_figures_by_type(FigureType.HERO, {TargetingContext.AOE_ABILITY_HITTABLE: True})
     
+    context = get_turn_context(map)
     for hero in heroes:
-        damage_count = 0
-        for lava in lava_tiles:
-            if map.distance_between(hero.position, lava.position) <= 1:
-                damage_count += 1
+        damage_count = sum(1 for figure in context.figures_within_distance(hero.position, 1) if figure in lava_tiles)
         
         if damage_count > 0:
             map.deal_damage(map.get_figures_by_type(FigureType.BOSS)[0], hero, 
@@ -347,10 +346,8 @@ def como_form_inferno_attack(map, como):
         map.deal_damage(como, target_hero, physical_damage=2, elemental_damage=2)
         
         # Deal 1 elemental to other heroes within range 1 of target (excluding primary target)
-        nearby_heroes = map.get_figures_within_distance(target_hero.position, 1)
-        for hero in nearby_heroes:
-            if hero.figure_type == FigureType.HERO and hero != target_hero:
-                map.deal_damage(como, hero, physical_damage=0, elemental_damage=1)
+        for hero in get_turn_context(map).adjacent_heroes(target_hero.position):
+            map.deal_damage(como, hero, physical_damage=0, elemental_damage=1)
 
 def como_form_swap(map):
     """Swap Forms between Champion and Inferno"""
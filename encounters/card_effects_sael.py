@@ -90,7 +90,7 @@ def sael_frost_tomb(map, sael):
     target_hero.hero.can_activate = False
 
     def tomb_damage_listener():
-        if target_hero not in map.figures:
+        if not map.has_figure(target_hero):
             return  # hero already dead, nothing to damage
         if not target_hero.get_effect('entombed'):
             return  # hero was freed (e.g. by restart round restoring snapshot)
@@ -107,7 +107,7 @@ def sael_frost_tomb(map, sael):
 
         if figure == tomb:
             # Tomb was destroyed — free the hero (if still alive)
-            if target_hero in map.figures:
+            if map.has_figure(target_hero):
                 target_hero.targeting_parameters[TargetingContext.ENEMY_TARGETABLE] = True
                 target_hero.targeting_parameters[TargetingContext.AOE_ABILITY_HITTABLE] = True
                 target_hero.remove_condition(Condition.STUNNED)
@@ -117,7 +117,7 @@ def sael_frost_tomb(map, sael):
                     ability.used = False
         else:
             # Hero died while entombed — remove the now-empty tomb
-            if tomb in map.figures:
+            if map.has_figure(tomb):
                 map.remove_figure(tomb)
 
     # tomb regularly damages, you are freed when it dies
@@ -277,8 +277,9 @@ class EncounterAcross(EncounterBase):
         self.next_boss_card = self.boss_deck.pop(0)
 
     def setup_map(self, map):
-        # Register Blade Storm bleed listener
-        map.events.register(GameEvent.DAMAGE_TAKEN, blade_storm_bleed_listener)
+        # Registered once, before any hero's listeners, so the bleed check sees the damage
+        # before a Shielded hero's shield absorbs it, for reinforcements too
+        map.fight_scope.register(GameEvent.DAMAGE_TAKEN, blade_storm_bleed_listener)
         
         # Initial enemy spawns for the gauntlet phase
         # Top row (y=10)
@@ -436,7 +437,7 @@ class EncounterAcross(EncounterBase):
     def move_map(self):
         """Shift all figures downward by 1 space, simulating forward movement in the gauntlet"""
         # Get all figures and their current positions
-        figures_and_positions = [(fig, self.map.get_figure_position(fig)) for fig in self.map.figures]
+        figures_and_positions = [(fig, self.map.get_figure_position(fig)) for fig in self.map.figures_by_id.values()]
         
         # Sort by Y coordinate (ascending) - process from bottom to top
         figures_and_positions.sort(key=lambda x: x[1].y)
@@ -119,7 +119,7 @@ class EncounterComo(EncounterBase):
         print(f"Comorragh begins in Form of the Champion! Physical Def: {como.physical_def}, Elemental Def: {como.elemental_def}")
         
         # Set up Hellfire passive effect
-        map.events.register(GameEvent.DAMAGE_TAKEN, como_hellfire_listener)
+        map.fight_scope.register(GameEvent.DAMAGE_TAKEN, como_hellfire_listener)
     
 
     def activate_doomguards(self):
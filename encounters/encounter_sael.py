@@ -17,6 +17,7 @@ import random
 from coords import Coords
 from encounters.enemy_ai import basic_action
 from game_targeting import TargetingContext
+from game_events import GameEvent
 
 sael_cards = [
     {   
@@ -128,8 +129,8 @@ class EncounterSael(EncounterBase):
         # sael starts in the middle
         map.add_figure(sael, Coords(5,5))
         # register the listener to track Biting Cold
-        map.events.register(
-            "defense_roll", 
+        map.fight_scope.register(
+            GameEvent.DEFENSE_ROLL, 
             lambda figure, roll_data, damage_type, **kwargs: sael_biting_cold_listener(figure, roll_data, damage_type, map)
         )
 
@@ -0,0 +1,62 @@
+from encounters.encounter_base import EncounterBase
+from figure import Figure, FigureType
+from coords import Coords
+import random
+
+
+class EncounterSynthetic(EncounterBase):
+    """
+    Seeded square board of any size for benchmarks and raid-scale tests (no boss or cards).
+
+    layout='scatter' drops obstacles independently on each square; layout='rooms' walls the
+    board into room_size rooms joined by one-square doorways, with obstacle_density applied
+    inside the rooms as well. Lava markers are scattered over the open squares at lava_density
+    and minion_count minions are placed on empty squares.
+    """
+    def __init__(self, size, obstacle_density=0.15, seed=0, lava_density=0.0, layout='scatter', room_size=12, minion_count=0):
+        super().__init__()
+        if layout not in ('scatter', 'rooms'):
+            raise ValueError(f"Unknown layout: {layout}")
+        self.name = f"Synthetic {size}x{size}"
+        self.size = size
+        self.obstacle_density = obstacle_density
+        self.lava_density = lava_density
+        self.layout = layout
+        self.room_size = room_size
+        self.minion_count = minion_count
+        self.seed = seed
+
+    def get_map_dimensions(self):
+        return (self.size, self.size)
+
+    def get_deployment_zone(self):
+        return [(x, 0) for x in range(self.size)]
+
+    def _room_walls(self, rng):
+        """Wall squares for the rooms layout: full-length wall lines, each with a doorway per room."""
+        walls = set()
+        for line in range(self.room_size, self.size, self.room_size):
+            for along in range(self.size):
+                walls.add((line, along))
+                walls.add((along, line))
+        for line in range(self.room_size, self.size, self.room_size):
+            for start in range(0, self.size, self.room_size):
+                end = min(self.size, start + self.room_size)
+                if end - start > 1:
+                    door = rng.randrange(start + 1, end) if start else rng.randrange(start, end)
+                    walls.discard((line, door))
+                    door = rng.randrange(start + 1, end) if start else rng.randrange(start, end)
+                    walls.discard((door, line))
+        return walls
+
+    def setup_map(self, map):
+        rng = random.Random(self.seed)
+        center = Coords(self.size // 2, self.size // 2)
+        walls = self._room_walls(rng) if self.layout == 'rooms' else set()
+        for square in map.squares:
+            if square != center and ((square.x, square.y) in walls or rng.random() < self.obstacle_density):
+                map.add_figure(Figure("Wall", FigureType.OBSTACLE), square)
+            elif rng.random() < self.lava_density:
+                map.add_figure(Figure("LAVA", FigureType.MARKER, hazard_damage=1), square)
+        for _ in range(self.minion_count):
+            map.add_figure(Figure("Minion", FigureType.MINION), rng.choice(map.squares), on_occupied='find_empty')
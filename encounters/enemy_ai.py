@@ -2,24 +2,27 @@ import random
 import math
 from figure import FigureType
 from game_targeting import TargetingContext
+from turn_context import get_turn_context
 
 def pythagorean_distance(pos1, pos2):
     """Calculate straight-line pythagorean distance between two positions."""
     return math.sqrt((pos1.x - pos2.x) ** 2 + (pos1.y - pos2.y) ** 2)
 
 def choose_target_hero(map, figure):
-    closest_heroes = []
-    closest_distance = float('inf')
-    for hero_figure in map.get_figures_by_type(FigureType.HERO, {TargetingContext.ENEMY_TARGETABLE: True}):        
-        distance = map.distance_between(figure.position, hero_figure.position, figure.impassible_types)
+    targetable_heroes = map.get_figures_by_type(FigureType.HERO, {TargetingContext.ENEMY_TARGETABLE: True})
+    # Only the nearest hero(es) get a distance (inf for all when none can be reached); the
+    # rest are known to be farther, and their distance is left out rather than searched for
+    nearest = get_turn_context(map).nearest_figures(figure.position, targetable_heroes, figure.impassible_types)
+    for hero_figure in targetable_heroes:
         priority = hero_figure.targeting_parameters[TargetingContext.TARGETING_PRIORITY]
-        print(f"DEBUG:   {hero_figure.name} at distance {distance}, targeting priority {priority}")
-        
-        if distance < closest_distance:
-            closest_distance = distance
-            closest_heroes = [hero_figure]
-        elif distance == closest_distance:
-            closest_heroes.append(hero_figure)
+        if hero_figure in nearest or not nearest:
+            distance = nearest.get(hero_figure, float('inf'))
+            print(f"DEBUG:   {hero_figure.name} at distance {distance}, targeting priority {priority}")
+        else:
+            print(f"DEBUG:   {hero_figure.name}, targeting priority {priority}")
+
+    # If no hero can be reached at all, every targetable hero is tied at infinite distance
+    closest_heroes = list(nearest) if nearest else list(targetable_heroes)
 
     if not closest_heroes:  # somehow there are no targetable heroes on the map.  Perhaps the last hero is untargetable due to an ability?
         return None
@@ -66,17 +69,11 @@ def make_enemy_move(game_map, enemy, player, move_range=None, impassible_types=N
     # Get all adjacent squares to the player
     adjacent_squares = game_map.get_horver_neighbors(player.position) + game_map.get_diag_neighbors(player.position)
     
-    # Find the closest square(s) by pathfinding distance
-    min_dist = float('inf')
-    best_candidates = []
-    
-    for square in adjacent_squares:
-        dist = game_map.distance_between(enemy.position, square, impassible_types)
-        if dist < min_dist:
-            min_dist = dist
-            best_candidates = [square]
-        elif dist == min_dist:
-            best_candidates.append(square)
+    # Find the closest square(s) by pathfinding distance.
+    # Read from the player's approach field: one search from all the squares around the player,
+    # shared by every enemy chasing this player until a blocker moves.
+    _, best_candidates = game_map.get_approach_field(player.position, impassible_types).get(
+        enemy.position, (float('inf'), adjacent_squares))
     
     # Tiebreak by pythagorean distance to player (naturally prefers orthogonal over diagonal)
     best_square = min(best_candidates, key=lambda sq: pythagorean_distance(sq, player.position))
@@ -91,6 +88,9 @@ def make_enemy_move(game_map, enemy, player, move_range=None, impassible_types=N
         return_paths=True,
         tiebreaker_target=player.position
     )
+    if best_square not in path_costs:
+        print(f"Enemy AI: {enemy.name} cannot reach {player.name}, not moving.")
+        return
     
     # Walk backwards from best_square to find the square we can reach with our movement
     current = best_square
@@ -110,4 +110,3 @@ def make_enemy_move(game_map, enemy, player, move_range=None, impassible_types=N
 
     for square in path_to_walk:
         game_map.move_figure(enemy, square)
-    
\ No newline at end of file
@@ -5,6 +5,7 @@ from coords import Coords
 from figure import FigureType
 from combat_helpers import aoe_attack_all_heroes, aoe_attack
 from encounters.enemy_ai import basic_action, choose_target_hero, make_enemy_move
+from turn_context import get_turn_context
 
 
 def activate_blade_storms(encounter, map, minion_type_value):
@@ -75,7 +76,7 @@ def activate_ash_walkers(encounter, map, minion_type_value):
                 # Check for splash damage effect (from Suffering card)
                 splash_range = minion.get_effect('splash_damage')
                 if splash_range:
-                    nearby_heroes = map.get_figures_within_distance(target_hero.position, splash_range)
+                    nearby_heroes = get_turn_context(map).figures_within_distance(target_hero.position, splash_range)
                     splash_targets = [h for h in nearby_heroes if h.figure_type == FigureType.HERO and h != target_hero]
                     
                     if splash_targets:
@@ -12,21 +12,21 @@ def register_temporary_listener(map, event, listener_fn, cleanup_event):
         listener_fn: The callback function to register
         cleanup_event: The GameEvent that triggers cleanup (e.g., HERO_TURN_START, BOSS_TURN_END)
     
+    Returns:
+        The ListenerScope holding the listener and its cleanup; disposing it ends the effect early
+
     Example:
         # Listener that lasts until the next hero turn
         register_temporary_listener(map, GameEvent.DAMAGE_TAKEN, my_listener, GameEvent.HERO_TURN_START)
     """
-    listener_id = map.events.register(event, listener_fn)
-    
-    def cleanup_listener(**kwargs):
-        map.events.deregister(event, listener_id)
+    scope = map.events.scope(f'until {cleanup_event}')
+    scope.register(event, listener_fn)
 
-    cleanup_id = map.events.register(cleanup_event, cleanup_listener)
+    def cleanup_listener(**kwargs):
+        scope.dispose()
 
-    def cleanup_cleanup(**kwargs):
-        map.events.deregister(cleanup_event, cleanup_id)
-    
-    map.events.register(cleanup_event, cleanup_cleanup)
+    scope.register(cleanup_event, cleanup_listener)
+    return scope
 
 
 def schedule_callback(map, event, callback_fn):
@@ -89,5 +89,5 @@ def modify_stat_temporarily(figure, stat_modifications, revert_event=GameEvent.H
 
         figure.map.events.deregister(revert_event, listener_id)
     
-    # Register the revert listener
-    listener_id = figure.map.events.register(revert_event, revert_listener)
+    # Register the revert listener (dropped with the figure's other listeners if it leaves the map first)
+    listener_id = figure.map.figure_scope(figure).register(revert_event, revert_listener)
@@ -1,33 +1,298 @@
-import uuid
+from itertools import chain, count
+from operator import itemgetter
+from time import perf_counter
+import json
 from game_events import GameEvent
 
+# Event names registered or triggered as plain strings map to their GameEvent
+_EVENTS_BY_NAME = {event.value: event for event in GameEvent}
+
+# Keyword argument naming the figure an event is caused by, for events that have one; every
+# event's subject (the figure it happens to) is its `figure` keyword argument
+SOURCE_ARGUMENTS = {
+    GameEvent.DAMAGE_TAKEN: 'damage_source',
+    GameEvent.DEFENSE_ROLL: 'damage_source',
+    GameEvent.HEALED: 'source',
+}
+
+_registration_order = itemgetter(1)
+
+
+class _Listeners(list):
+    """
+    Listener cells in registration order: [callback, handle], callback None once deregistered.
+    keyed counts the live subject- and source-keyed listeners of the event (on its global list only).
+    """
+    __slots__ = ('dead', 'keyed')
+
+    def __init__(self, cells=()):
+        super().__init__(cells)
+        self.dead = 0
+        self.keyed = 0
+
+
+class ListenerScope:
+    """
+    Listeners that share a lifetime (a fight, a round, a card's effect, a figure's time on the
+    board): register through the scope and dispose() deregisters all of them at once.
+    """
+    def __init__(self, events, name=None):
+        self.events = events
+        self.name = name
+        self.handles = set()  # live handles registered through this scope
+
+    def register(self, event_name, callback, figure=None, source=None):
+        """Register a callback for an event within this scope; returns its handle."""
+        return self.events.register(event_name, callback, scope=self, figure=figure, source=source)
+
+    def dispose(self):
+        """Deregister every listener still registered through this scope."""
+        for listener_id in list(self.handles):
+            self.events.deregister(None, listener_id)
+
+    def __len__(self):
+        return len(self.handles)
+
+    def __repr__(self):
+        return f"ListenerScope({self.name!r}, {len(self.handles)} listeners)"
+
+
+class EventProfile:
+    """
+    Call counts and wall time per event and per listener, collected by EventManager while
+    profiling is on. Listeners are grouped by module and __qualname__, so all the closures one
+    function creates (one per figure, say) share a row. Event times include their listeners and
+    any events those trigger in turn.
+    """
+    def __init__(self):
+        self.events = {}  # event name -> [calls, total seconds, max seconds]
+        self.listeners = {}  # listener name -> [calls, total seconds, max seconds]
+
+    @staticmethod
+    def listener_name(callback):
+        name = getattr(callback, '__qualname__', None) or type(callback).__qualname__
+        module = getattr(callback, '__module__', None)
+        return f"{module}.{name}" if module else name
+
+    @staticmethod
+    def record(table, key, elapsed):
+        entry = table.get(key)
+        if entry is None:
+            table[key] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+    @staticmethod
+    def _rows(table):
+        rows = {name: {'calls': calls, 'total_ms': total * 1000, 'max_ms': longest * 1000, 'mean_ms': total * 1000 / calls}
+                for name, (calls, total, longest) in table.items()}
+        return dict(sorted(rows.items(), key=lambda item: -item[1]['total_ms']))
+
+    def to_dict(self):
+        """{'events': {...}, 'listeners': {...}}, each row {'calls', 'total_ms', 'max_ms', 'mean_ms'}, slowest first."""
+        return {'events': self._rows(self.events), 'listeners': self._rows(self.listeners)}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def report(self, limit=15):
+        """
+        Plain-text tables of the slowest events and listeners. Times are inclusive: a row counts
+        the listeners and nested triggers it ran, so rows overlap and do not add up.
+        """
+        lines = []
+        for title, rows in self.to_dict().items():
+            lines.append(f"{title} (by inclusive time, nested triggers included)")
+            lines.append(f"  {'calls':>7} {'incl ms':>10} {'max ms':>9} {'mean ms':>9}  name")
+            for name, row in list(rows.items())[:limit]:
+                lines.append(f"  {row['calls']:>7} {row['total_ms']:>10.2f} {row['max_ms']:>9.3f} {row['mean_ms']:>9.4f}  {name}")
+        return "\n".join(lines)
+
+
 class EventManager:
+    """
+    Listeners are looked up by GameEvent directly; string names are resolved to their GameEvent.
+
+    register returns an integer handle. deregister tombstones the listener's cell in O(1), so
+    it is skipped from then on, even by a trigger already running, and a listener list is
+    compacted into a fresh one once half its cells are dead. A trigger in progress keeps walking
+    the list it started with, so it also calls listeners registered during it unless a
+    compaction happened in between.
+
+    A listener registered with figure= is only called when that figure is the event's subject,
+    one registered with source= only when the figure is its source (see SOURCE_ARGUMENTS), so a
+    trigger only visits the global listeners and those keyed to its own figures. When keyed
+    listeners match, all matching listeners are called in registration order.
+
+    generations counts the registrations and deregistrations of each event, so a value derived
+    from an event's listeners (see Figure.move) can tell when they may have changed.
+
+    start_profiling() times every trigger into an EventProfile until stop_profiling(); it swaps
+    in a timing trigger on the instance, so the plain trigger carries no profiling checks.
+    """
     def __init__(self):
-        self.listeners = {}
+        self.listeners = {}  # GameEvent (or unknown string name) -> global _Listeners
+        self.subject_listeners = {}  # GameEvent -> {subject figure: _Listeners}
+        self.source_listeners = {}  # GameEvent -> {source figure: _Listeners}
+        self.cells = {}  # handle -> (event, table holding its list, key in that table, cell, scope or None)
+        self.handles = count()
+        self.generations = {}  # GameEvent -> registrations plus deregistrations so far
+        self.profile = None  # EventProfile of the last start_profiling()
 
-    def _normalize_event_name(self, event_name):
-        """Convert event name to string, supporting both GameEvent enum and string inputs."""
+    def _resolve(self, event_name):
+        """Dispatch key of an event name: the GameEvent itself, or the GameEvent a string names."""
         if isinstance(event_name, GameEvent):
-            return event_name.value
-        return event_name
-
-    def register(self, event_name, callback):
-        """Register a callback for an event. Accepts either GameEvent enum or string."""
-        normalized_name = self._normalize_event_name(event_name)
-        listener_id = uuid.uuid4()
-        self.listeners.setdefault(normalized_name, []).append((listener_id, callback))
+            return event_name
+        return _EVENTS_BY_NAME.get(event_name, event_name)
+
+    def scope(self, name=None):
+        """A new, empty ListenerScope on this manager."""
+        return ListenerScope(self, name)
+
+    def register(self, event_name, callback, scope=None, figure=None, source=None):
+        """
+        Register a callback for an event. Accepts either GameEvent enum or string.
+        With figure (or source), the callback only hears the event when that figure is its subject (or source).
+        """
+        event = self._resolve(event_name)
+        listeners = self.listeners.get(event)
+        if listeners is None:
+            listeners = self.listeners[event] = _Listeners()
+        if figure is not None and source is not None:
+            raise ValueError("A listener can be keyed by its subject figure or by its source, not both")
+        if figure is not None:
+            table, key = self.subject_listeners.setdefault(event, {}), figure
+        elif source is not None:
+            if event not in SOURCE_ARGUMENTS:
+                raise ValueError(f"Event {event} has no source figure to key listeners by")
+            table, key = self.source_listeners.setdefault(event, {}), source
+        else:
+            table, key = self.listeners, event
+        if table is not self.listeners:
+            listeners.keyed += 1
+            listeners = table.get(key)
+            if listeners is None:
+                listeners = table[key] = _Listeners()
+        listener_id = next(self.handles)
+        self.generations[event] = self.generations.get(event, 0) + 1
+        cell = [callback, listener_id]
+        listeners.append(cell)
+        self.cells[listener_id] = (event, table, key, cell, scope)
+        if scope is not None:
+            scope.handles.add(listener_id)
         return listener_id
 
     def deregister(self, event_name, listener_id):
-        """Deregister a callback. Accepts either GameEvent enum or string."""
-        normalized_name = self._normalize_event_name(event_name)
-        if normalized_name in self.listeners:
-            self.listeners[normalized_name] = [
-                (lid, cb) for (lid, cb) in self.listeners[normalized_name] if lid != listener_id
-            ]
+        """Deregister a callback. Accepts either GameEvent enum or string; unknown handles are ignored."""
+        entry = self.cells.pop(listener_id, None)
+        if entry is None:
+            return
+        event, table, key, cell, scope = entry
+        cell[0] = None
+        self.generations[event] += 1
+        if scope is not None:
+            scope.handles.discard(listener_id)
+        if table is not self.listeners:
+            self.listeners[event].keyed -= 1
+        listeners = table[key]
+        listeners.dead += 1
+        if listeners.dead * 2 > len(listeners):
+            live = _Listeners(cell for cell in listeners if cell[0] is not None)
+            if table is self.listeners:
+                live.keyed = listeners.keyed
+                table[key] = live
+            elif live:
+                table[key] = live
+            else:
+                del table[key]  # the figure has no listeners left for this event
+
+    def _matching(self, event, listeners, kwargs):
+        """The listeners one trigger of event calls: its global listeners plus those keyed to its subject or source."""
+        runs = [listeners] if len(listeners) > listeners.dead else []
+        by_subject = self.subject_listeners.get(event)
+        if by_subject:
+            run = by_subject.get(kwargs.get('figure'))
+            if run:
+                runs.append(run)
+        by_source = self.source_listeners.get(event)
+        if by_source:
+            run = by_source.get(kwargs.get(SOURCE_ARGUMENTS[event]))
+            if run:
+                runs.append(run)
+        if len(runs) == 1:
+            return runs[0]
+        if len(runs) == 2:
+            first, second = runs
+            if first[-1][1] < second[0][1]:
+                return first + second
+            if second[-1][1] < first[0][1]:
+                return second + first
+        return sorted(chain.from_iterable(runs), key=_registration_order)
 
     def trigger(self, event_name, *args, **kwargs):
         """Trigger an event. Accepts either GameEvent enum or string."""
-        normalized_name = self._normalize_event_name(event_name)
-        for _, callback in self.listeners.get(normalized_name, []):
-            callback(*args, **kwargs)
\ No newline at end of file
+        # Dispatch stays inline: this is the hot path, and _profiled_trigger has its own copy
+        listeners = self.listeners.get(event_name)
+        if listeners is None:
+            event_name = self._resolve(event_name)
+            listeners = self.listeners.get(event_name)
+            if listeners is None:
+                return
+        if listeners.keyed:
+            listeners = self._matching(event_name, listeners, kwargs)
+        for cell in listeners:
+            callback = cell[0]
+            if callback is not None:
+                callback(*args, **kwargs)
+
+    def start_profiling(self):
+        """Start timing triggers into a fresh EventProfile, which is returned (and kept as self.profile)."""
+        self.profile = EventProfile()
+        self.trigger = self._profiled_trigger
+        return self.profile
+
+    def stop_profiling(self):
+        """Go back to the untimed trigger; returns the EventProfile collected."""
+        self.__dict__.pop('trigger', None)
+        return self.profile
+
+    def _profiled_trigger(self, event_name, *args, **kwargs):
+        """trigger, timing the event and each listener it calls into self.profile."""
+        profile = self.profile
+        started = perf_counter()
+        event_name = self._resolve(event_name)
+        listeners = self.listeners.get(event_name)
+        if listeners is None:
+            listeners = ()
+        elif listeners.keyed:
+            listeners = self._matching(event_name, listeners, kwargs)
+        try:
+            for cell in listeners:
+                callback = cell[0]
+                if callback is not None:
+                    called = perf_counter()
+                    try:
+                        callback(*args, **kwargs)
+                    finally:
+                        profile.record(profile.listeners, profile.listener_name(callback), perf_counter() - called)
+        finally:
+            name = event_name.value if isinstance(event_name, GameEvent) else str(event_name)
+            profile.record(profile.events, name, perf_counter() - started)
+
+    def listener_count(self, event_name=None):
+        """Number of registered listeners for one event (keyed ones included), or for all events."""
+        if event_name is None:
+            return len(self.cells)
+        listeners = self.listeners.get(self._resolve(event_name))
+        return len(listeners) - listeners.dead + listeners.keyed if listeners else 0
+
+    def listener_counts(self):
+        """Number of registered listeners per event (keyed ones included), for events that have any."""
+        counts = {}
+        for event, listeners in self.listeners.items():
+            if len(listeners) - listeners.dead + listeners.keyed:
+                counts[event] = len(listeners) - listeners.dead + listeners.keyed
+        return counts
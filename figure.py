@@ -1,8 +1,8 @@
 import random
 from enum import Enum
 from game_events import GameEvent
-from game_conditions import Condition
-from game_targeting import default_targeting_parameters, marker_targeting_parameters
+from game_conditions import Condition, Conditions
+from game_targeting import default_targeting_parameters, marker_targeting_parameters, TargetingParameters
 class FigureType(Enum):
     BOSS = 'boss'
     HERO = 'hero'
@@ -31,12 +31,26 @@ class Figure:
             self.impassible_types.append(FigureType.BOSS)
             self.impassible_types.append(FigureType.MINION)
         self.targeting_parameters = marker_targeting_parameters.copy() if self.figure_type == FigureType.MARKER else default_targeting_parameters.copy()
+        self.derived_stats = {}  # stat name -> (stamp, value), see derived_stat
         self.conditions = {}  # e.g. { 'Burn' : 2, 'Bleed': 1 }
         self.active_effects = {} # e.g. { 'gained_combo_points': True, 'combo_points': 0 }
         self.fixed_representation = fixed_representation
         self.cell_color = cell_color
         self.map = None  # Will be set when added to a map
 
+    @property
+    def targeting_parameters(self):
+        return self._targeting_parameters
+
+    @targeting_parameters.setter
+    def targeting_parameters(self, values):
+        figure_map = getattr(self, 'map', None)
+        if figure_map is not None:
+            figure_map.unindex_targeting(self)
+        self._targeting_parameters = TargetingParameters(self, values)
+        if figure_map is not None:
+            figure_map.index_targeting(self)
+
     @classmethod
     def from_hero_archetype(cls, hero_archetype):
         hero_figure = cls(
@@ -56,11 +70,39 @@ class Figure:
     def position(self):
         return self.map.get_figure_position(self)
     
+    @property
+    def conditions(self):
+        return self._conditions
+
+    @conditions.setter
+    def conditions(self, conditions):
+        self._conditions = Conditions(self, conditions)
+        self.derived_stats.clear()
+
     @property
     def move(self):
-        move_data = {"value": self.base_move}
-        self.map.events.trigger(GameEvent.GET_MOVE, figure=self, move_data=move_data)
-        return move_data["value"]
+        return self.derived_stat('move', GameEvent.GET_MOVE, self.base_move)
+
+    def derived_stat(self, stat, event, base_value):
+        """
+        base_value as modified by the listeners of event, which get figure and a '<stat>_data' dict
+        whose 'value' they may change. The result is cached until base_value, the event's listeners,
+        the figure's conditions (any change to the Conditions dict) or the turn (Map.stats_epoch) change; a listener that depends on
+        anything else should call invalidate_stats() when that changes.
+        """
+        events = self.map.events
+        stamp = (events, events.generations.get(event, 0), self.map.stats_epoch, base_value)
+        cached = self.derived_stats.get(stat)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        data = {"value": base_value}
+        events.trigger(event, **{'figure': self, stat + '_data': data})
+        self.derived_stats[stat] = (stamp, data["value"])
+        return data["value"]
+
+    def invalidate_stats(self):
+        """Forget the cached derived stats (move), so the next read asks the listeners again."""
+        self.derived_stats.clear()
 
     def get_representation_text(self):
         if self.fixed_representation:
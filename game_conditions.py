@@ -1,3 +1,4 @@
+import copy
 from enum import Enum
 
 class Condition(Enum):
@@ -30,4 +31,72 @@ class Condition(Enum):
 
     def __str__(self):
         """Return the string value for backwards compatibility."""
-        return self.value
\ No newline at end of file
+        return self.value
+
+
+class Conditions(dict):
+    """
+    A figure's conditions, e.g. { 'Burn' : 2, 'Bleed': 1 }. Behaves as a plain dict, but every
+    change clears the figure's cached derived stats (Figure.derived_stat), however it is made.
+
+    Copies stay Conditions. A deepcopy that copies the figure along with them is bound to the
+    figure's copy; any other copy, and an unpickled one, is detached (figure None) until it is
+    assigned to a figure through Figure.conditions.
+    """
+    def __init__(self, figure, values=()):
+        super().__init__(values)
+        self.figure = figure
+
+    def __setitem__(self, condition, duration):
+        super().__setitem__(condition, duration)
+        self._changed()
+
+    def __delitem__(self, condition):
+        super().__delitem__(condition)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, condition, default=None):
+        if condition not in self:
+            self[condition] = default
+        return self[condition]
+
+    def pop(self, condition, *default):
+        if condition not in self:
+            return super().pop(condition, *default)
+        duration = super().pop(condition)
+        self._changed()
+        return duration
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def copy(self):
+        return self.__copy__()
+
+    def __copy__(self):
+        return Conditions(None, self)
+
+    def __deepcopy__(self, memo):
+        figure = memo.get(id(self.figure)) if self.figure is not None else None
+        return Conditions(figure, copy.deepcopy(dict(self), memo))
+
+    def __reduce__(self):
+        return (Conditions, (None, dict(self)))
+
+    def _changed(self):
+        if self.figure is not None:
+            self.figure.invalidate_stats()
@@ -1,6 +1,5 @@
 import copy
 import random
-from coords import Coords
 from figure import FigureType
 
 class GameStateSnapshot:
@@ -24,12 +23,12 @@ class GameStateSnapshot:
         """Snapshot all figure states including position and attributes."""
         figure_states = {}
         
-        for figure in map_obj.figures:
+        for figure in map_obj.figures_by_id.values():
             state = {
                 'id': figure.id,
                 'name': figure.name,
                 'figure_type': figure.figure_type,
-                'position': Coords(map_obj.positions[figure].x, map_obj.positions[figure].y),
+                'square': map_obj.square_index(map_obj.positions[figure]),
                 'current_health': figure.current_health,
                 'max_health': figure.max_health,
                 'conditions': copy.deepcopy(figure.conditions),
@@ -86,7 +85,7 @@ class GameStateSnapshot:
         map_obj.current_round = self.map_state['current_round']
         
         # Build a mapping of current figure IDs to figure objects
-        current_figures = {fig.id: fig for fig in map_obj.figures}
+        current_figures = dict(map_obj.figures_by_id)
         snapshot_figure_ids = set(self.figure_states.keys())
         current_figure_ids = set(current_figures.keys())
         
@@ -112,16 +111,9 @@ class GameStateSnapshot:
     def _restore_figure(self, figure, state, map_obj):
         """Restore a figure's state from snapshot."""
         # Restore position if changed
-        current_pos = map_obj.positions.get(figure)
-        if current_pos != state['position']:
-            # Move figure back to original position
-            old_pos = current_pos
-            new_pos = state['position']
-            
-            # Update map data structures
-            map_obj.cell_contents[old_pos.y][old_pos.x].remove(figure)
-            map_obj.cell_contents[new_pos.y][new_pos.x].append(figure)
-            map_obj.positions[figure] = new_pos
+        if map_obj.square_index(map_obj.positions[figure]) != state['square']:
+            # Move figure back to original position (no hazards or events)
+            map_obj.relocate_figure(figure, map_obj.squares[state['square']])
         
         # Restore health and stats
         figure.current_health = state['current_health']
@@ -134,7 +126,9 @@ class GameStateSnapshot:
         figure.physical_dmg = state['physical_dmg']
         figure.elemental_dmg = state['elemental_dmg']
         figure.attack_range = state['attack_range']
-        figure.hazard_damage = state['hazard_damage']
+        if figure.hazard_damage != state['hazard_damage']:
+            figure.hazard_damage = state['hazard_damage']
+            map_obj.refresh_square(map_obj.positions[figure])
         figure.targeting_parameters = copy.deepcopy(state['targeting_parameters'])
         figure.fixed_representation = state['fixed_representation']
         figure.cell_color = state['cell_color']
@@ -1,3 +1,4 @@
+import copy
 from enum import Enum
 class TargetingContext(Enum):
     ENEMY_TARGETABLE = "enemy_targetable"
@@ -20,4 +21,82 @@ marker_targeting_parameters = {
     TargetingContext.AOE_ABILITY_HITTABLE: False,
     TargetingContext.TARGETING_PRIORITY: None,
     TargetingContext.RENDERING_PRIORITY: -1,
-}
\ No newline at end of file
+}
+
+_MISSING = object()  # "no value for this context", distinct from None
+
+
+class TargetingParameters(dict):
+    """
+    A figure's targeting_parameters. Behaves as a plain dict, but reports every change to the
+    figure's map so Map.figures_by_targeting stays current: every mutating method goes through
+    __setitem__ or __delitem__.
+
+    Copies stay TargetingParameters. A deepcopy that copies the figure along with them (a copied
+    figure or map) is bound to the figure's copy; any other copy, and an unpickled one, is
+    detached (figure None) until it is assigned to a figure through Figure.targeting_parameters.
+    """
+    def __init__(self, figure, values=()):
+        super().__init__(values)
+        self.figure = figure
+
+    def __setitem__(self, context, value):
+        old_value = self.get(context, _MISSING)
+        super().__setitem__(context, value)
+        self._changed(context, old_value, value)
+
+    def __delitem__(self, context):
+        old_value = self[context]
+        super().__delitem__(context)
+        self._changed(context, old_value, _MISSING)
+
+    def update(self, *args, **kwargs):
+        for context, value in dict(*args, **kwargs).items():
+            self[context] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, context, default=None):
+        if context not in self:
+            self[context] = default
+        return self[context]
+
+    def pop(self, context, *default):
+        if context not in self:
+            return super().pop(context, *default)
+        value = self[context]
+        del self[context]
+        return value
+
+    def popitem(self):
+        context, value = super().popitem()
+        self._changed(context, value, _MISSING)
+        return context, value
+
+    def clear(self):
+        for context in list(self):
+            del self[context]
+
+    def copy(self):
+        return self.__copy__()
+
+    def __copy__(self):
+        return TargetingParameters(None, self)
+
+    def __deepcopy__(self, memo):
+        figure = memo.get(id(self.figure)) if self.figure is not None else None
+        return TargetingParameters(figure, copy.deepcopy(dict(self), memo))
+
+    def __reduce__(self):
+        return (TargetingParameters, (None, dict(self)))
+
+    def _changed(self, context, old_value, new_value):
+        figure_map = getattr(self.figure, 'map', None)
+        if figure_map is None:
+            return
+        if old_value is not _MISSING:
+            figure_map.unindex_targeting_value(self.figure, context, old_value)
+        if new_value is not _MISSING:
+            figure_map.index_targeting_value(self.figure, context, new_value)
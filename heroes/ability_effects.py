@@ -56,8 +56,9 @@ def rogue_eviscerate_turn_end_listener(hero):
 def rogue_eviscerate_setup(hero):
     hero.figure.add_effect('combo_points', 0)
     hero.figure.add_effect('gained_combo_points', False)
-    hero.figure.map.events.register("damage_taken", lambda damage_source, **kwargs: rogue_eviscerate_attack_listener(damage_source, hero))
-    hero.figure.map.events.register("hero_turn_end", lambda: rogue_eviscerate_turn_end_listener(hero))
+    scope = hero.figure.map.figure_scope(hero.figure)
+    scope.register(GameEvent.DAMAGE_TAKEN, lambda damage_source, **kwargs: rogue_eviscerate_attack_listener(damage_source, hero), source=hero.figure)
+    scope.register(GameEvent.HERO_TURN_END, lambda: rogue_eviscerate_turn_end_listener(hero))
 
 def rogue_eviscerate(figure, energy_spent, ui=None):
     current_combo_points = figure.get_effect('combo_points')
@@ -149,9 +150,10 @@ def mage_combustion_listener(mage_hero, figure, roll_data, damage_type, damage_s
             print('Mage Combustion triggered for extra damage!')
 
 def mage_combustion_setup(hero):
-    hero.figure.map.events.register(
+    hero.figure.map.figure_scope(hero.figure).register(
         GameEvent.DEFENSE_ROLL, 
-        lambda figure, roll_data, damage_type, damage_source: mage_combustion_listener(hero, figure, roll_data, damage_type, damage_source)
+        lambda figure, roll_data, damage_type, damage_source: mage_combustion_listener(hero, figure, roll_data, damage_type, damage_source),
+        source=hero.figure
     )
     return
 
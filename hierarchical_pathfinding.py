@@ -0,0 +1,259 @@
+"""Cluster abstraction over large boards (HPA*): plan between cluster entrances, then refine locally."""
+
+import heapq
+
+
+class ClusterHierarchy:
+    """
+    Splits the board into cluster_size x cluster_size clusters. Every maximal run of open
+    square pairs along a shared cluster border is an entrance with one transition (two for long
+    runs) whose squares become nodes of the abstract graph. Nodes in the same cluster are joined
+    by their cheapest path inside the cluster, computed the first time a search reaches that
+    cluster. A query links start and goal to the nodes of their own clusters, runs A* over the
+    abstract graph and, for find_path, stitches the local paths back together.
+
+    Paths only bend at transitions, so costs can come out slightly above the true shortest
+    distance; Map falls back to its exact searches whenever the hierarchy finds no route.
+    One hierarchy serves one set of impassible types. The map reports each figure change
+    through squares_changed, and only the borders around changed squares are rebuilt.
+    """
+    LONG_ENTRANCE = 6  # entrances at least this wide get a transition at each end
+
+    def __init__(self, map, impassible_types, blocking_mask, cluster_size=10):
+        self.map = map
+        self.impassible_types = frozenset(impassible_types or ())
+        self.blocking_mask = blocking_mask
+        self.cluster_size = cluster_size
+        self.columns = (map.width + cluster_size - 1) // cluster_size
+        self.rows = (map.height + cluster_size - 1) // cluster_size
+        self.version = None  # map.blocking_version(impassible_types) the borders were built at
+        self.borders = {}  # (cluster, neighbouring cluster) -> [(square, square across)], left/top cluster first
+        self.crossings = {}  # transition square -> set of transition squares across its borders
+        self.intra = {}  # cluster -> {node: [(node, cost, path)]}, filled lazily
+        self.dirty = set()  # clusters whose borders must be rebuilt before the next query
+
+    # -- structure ----------------------------------------------------------
+
+    def cluster_of(self, square):
+        return (square.x // self.cluster_size, square.y // self.cluster_size)
+
+    def _cluster_neighbors(self, cluster):
+        cx, cy = cluster
+        for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+            if 0 <= nx < self.columns and 0 <= ny < self.rows:
+                yield (nx, ny)
+
+    def _border_key(self, cluster, other):
+        return (cluster, other) if cluster < other else (other, cluster)
+
+    def _open(self, x, y):
+        return not self.map.cell_masks[y * self.map.width + x] & self.blocking_mask
+
+    def _build_border(self, key):
+        """Transitions across the border between two side-by-side or stacked clusters."""
+        (ax, ay), (bx, by) = key
+        size = self.cluster_size
+        squares = self.map.squares
+        width = self.map.width
+        if ax != bx:  # side by side: the border is a column pair
+            x = bx * size
+            pairs = [(squares[y * width + x - 1], squares[y * width + x])
+                     for y in range(ay * size, min(self.map.height, (ay + 1) * size))]
+        else:  # stacked: the border is a row pair
+            y = by * size
+            pairs = [(squares[(y - 1) * width + x], squares[y * width + x])
+                     for x in range(ax * size, min(width, (ax + 1) * size))]
+        transitions = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and self._open(pair[0].x, pair[0].y) and self._open(pair[1].x, pair[1].y):
+                run.append(pair)
+                continue
+            if len(run) >= self.LONG_ENTRANCE:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        return transitions
+
+    def _set_border(self, key, transitions):
+        for pair in self.borders.get(key, ()):
+            for square, across in (pair, pair[::-1]):
+                self.crossings[square].discard(across)
+                if not self.crossings[square]:
+                    del self.crossings[square]
+        self.borders[key] = transitions
+        for near, far in transitions:
+            self.crossings.setdefault(near, set()).add(far)
+            self.crossings.setdefault(far, set()).add(near)
+
+    def rebuild(self):
+        self.borders.clear()
+        self.crossings.clear()
+        self.intra.clear()
+        self.dirty.clear()
+        for cy in range(self.rows):
+            for cx in range(self.columns):
+                for other in ((cx + 1, cy), (cx, cy + 1)):
+                    if other[0] < self.columns and other[1] < self.rows:
+                        self._set_border(((cx, cy), other), self._build_border(((cx, cy), other)))
+        self.version = self.map.blocking_version(self.impassible_types)
+
+    def squares_changed(self, figure_type, squares):
+        """The blocked status of these squares may have changed (after one add, remove or move)."""
+        if figure_type not in self.impassible_types or self.version is None:
+            return
+        current_version = self.map.blocking_version(self.impassible_types)
+        if self.version != current_version - 1:
+            self.version = None  # missed a change: rebuild from scratch on the next query
+            return
+        for square in squares:
+            self.dirty.add(self.cluster_of(square))
+        self.version = current_version
+
+    def _refresh(self):
+        if self.version != self.map.blocking_version(self.impassible_types):
+            self.rebuild()
+            return
+        touched = set()
+        for cluster in self.dirty:
+            touched.add(cluster)
+            for other in self._cluster_neighbors(cluster):
+                key = self._border_key(cluster, other)
+                self._set_border(key, self._build_border(key))
+                touched.add(other)
+        for cluster in touched:
+            self.intra.pop(cluster, None)
+        self.dirty.clear()
+
+    def _nodes(self, cluster):
+        nodes = []
+        for other in self._cluster_neighbors(cluster):
+            key = self._border_key(cluster, other)
+            side = 0 if key[0] == cluster else 1
+            nodes += [pair[side] for pair in self.borders.get(key, ())]
+        return nodes
+
+    def _intra_edges(self, cluster):
+        if cluster not in self.intra:
+            nodes = self._nodes(cluster)
+            edges = {}
+            for node in nodes:
+                costs, came_from = self._local_search(node, cluster, nodes)
+                edges[node] = [(other, costs[other], self._rebuild_path(came_from, other))
+                               for other in nodes if other != node and other in costs]
+            self.intra[cluster] = edges
+        return self.intra[cluster]
+
+    # -- searching ----------------------------------------------------------
+
+    def _local_search(self, start, cluster, targets):
+        """Dijkstra from start that never leaves cluster; stops once every target is settled."""
+        size = self.cluster_size
+        x0, y0 = cluster[0] * size, cluster[1] * size
+        x1, y1 = x0 + size, y0 + size
+        cell_masks = self.map.cell_masks
+        width = self.map.width
+        blocking_mask = self.blocking_mask
+        remaining = set(targets)
+        best = {start: 0.0}
+        settled = {}
+        came_from = {}
+        counter = 0
+        queue = [(0.0, counter, start)]
+        while queue and remaining:
+            cost, _, current = heapq.heappop(queue)
+            if current in settled:
+                continue
+            settled[current] = cost
+            remaining.discard(current)
+            if current != start and cell_masks[current.y * width + current.x] & blocking_mask:
+                continue  # blocked squares can be reached (as a target) but not crossed
+            steps = [(neighbor, 1) for neighbor in self.map.get_horver_neighbors(current)]
+            steps += [(neighbor, 1.5) for neighbor in self.map.get_diag_neighbors(current)
+                      if self.map._diagonal_crossing(current, neighbor, blocking_mask)[0]]
+            for neighbor, step_cost in steps:
+                if not (x0 <= neighbor.x < x1 and y0 <= neighbor.y < y1) or neighbor in settled:
+                    continue
+                new_cost = cost + step_cost
+                if new_cost < best.get(neighbor, float('inf')):
+                    best[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    counter += 1
+                    heapq.heappush(queue, (new_cost, counter, neighbor))
+        return settled, came_from
+
+    @staticmethod
+    def _rebuild_path(came_from, square):
+        path = [square]
+        while path[-1] in came_from:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return path
+
+    def find_path(self, start, goal):
+        """(cost, path from start to goal) through the abstract graph, or None if it finds no route."""
+        self._refresh()
+        start = self.map.intern_coords(start)
+        goal = self.map.intern_coords(goal)
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        if start_cluster == goal_cluster:
+            return None
+        self.map.search_count += 1
+
+        # Link start and goal into the abstract graph (distances are symmetric, so the goal's
+        # links are searched from the goal)
+        start_nodes = self._nodes(start_cluster)
+        costs, came_from = self._local_search(start, start_cluster, start_nodes)
+        start_links = {node: (costs[node], self._rebuild_path(came_from, node)) for node in start_nodes if node in costs}
+        goal_nodes = self._nodes(goal_cluster)
+        costs, came_from = self._local_search(goal, goal_cluster, goal_nodes)
+        goal_links = {node: (costs[node], self._rebuild_path(came_from, node)[::-1]) for node in goal_nodes if node in costs}
+
+        def heuristic(square):
+            dx = abs(square.x - goal.x)
+            dy = abs(square.y - goal.y)
+            return max(dx, dy) + 0.5 * min(dx, dy)
+
+        best = {}
+        came_from = {}  # node -> (previous node or start, local path from it)
+        counter = 0
+        queue = []
+        for node, (cost, path) in start_links.items():
+            if cost < best.get(node, float('inf')):
+                best[node] = cost
+                came_from[node] = (start, path)
+                counter += 1
+                heapq.heappush(queue, (cost + heuristic(node), counter, cost, node))
+        closed = set()
+        while queue:
+            _, _, cost, current = heapq.heappop(queue)
+            if current == goal:
+                break
+            if current in closed:
+                continue
+            closed.add(current)
+            steps = self._intra_edges(self.cluster_of(current))[current] + [(node, 1, [current, node]) for node in self.crossings.get(current, ())]
+            if current in goal_links:
+                steps.append((goal,) + goal_links[current])
+            for node, edge_cost, path in steps:
+                new_cost = cost + edge_cost
+                if new_cost < best.get(node, float('inf')):
+                    best[node] = new_cost
+                    came_from[node] = (current, path)
+                    counter += 1
+                    heapq.heappush(queue, (new_cost + heuristic(node), counter, new_cost, node))
+        if goal not in best:
+            return None
+
+        # Refine: chain the local paths back from the goal
+        pieces = []
+        current = goal
+        while current != start:
+            current, path = came_from[current]
+            pieces.append(path)
+        path = [start]
+        for piece in reversed(pieces):
+            path += piece[1:]
+        return best[goal], path
@@ -25,7 +25,7 @@ class FrozenCrown(Item):
             if hero.energy_spent_abilities >= 4:
                 hero.gain_energy(1)
                 print(f"{hero.name}: Frozen Crown — regained 1 energy.")
-        fight_map.events.register(GameEvent.HERO_TURN_END, listener)
+        fight_map.figure_scope(hero.figure).register(GameEvent.HERO_TURN_END, listener)
 
 
 # ---------------------------------------------------------------------------
@@ -44,15 +44,13 @@ class StormsEye(Item):
     def apply(self, hero, fight_map):
         def listener(**kwargs):
             figure = kwargs.get('figure')
-            if figure != hero.figure:
-                return
             # Deal 1 elemental damage to all adjacent enemies
             adjacent = fight_map.get_figures_within_distance(figure.position, 1)
             for target in adjacent:
                 if target.targeting_parameters.get(TargetingContext.ENEMY_TARGETABLE, False) and target.figure_type in (FigureType.BOSS, FigureType.MINION):
                     fight_map.deal_damage(figure, target, physical_damage=0, elemental_damage=1)
                     print(f"{hero.name}: Storm's Eye — dealt 1 elemental to {target.name}.")
-        fight_map.events.register(GameEvent.FIGURE_MOVED, listener)
+        fight_map.figure_scope(hero.figure).register(GameEvent.FIGURE_MOVED, listener, figure=hero.figure)
 
 
 # ---------------------------------------------------------------------------
@@ -72,24 +70,21 @@ class IcicleShards(Item):
         one_count = [0]
 
         def defense_listener(**kwargs):
-            if kwargs.get('damage_source') != hero.figure:
-                return
             if kwargs.get('damage_type') != 'Physical':
                 return
             if kwargs['roll_data']['value'] == 1:
                 one_count[0] += 1
 
         def damage_listener(**kwargs):
-            if kwargs.get('damage_source') != hero.figure:
-                return
             target = kwargs.get('figure')
             if one_count[0] >= 2 and target is not None:
                 target.add_condition(Condition.BLEED, 5)
                 print(f"{hero.name}: Icicle Shards — applied Bleed 5 to {target.name}.")
             one_count[0] = 0
 
-        fight_map.events.register(GameEvent.DEFENSE_ROLL, defense_listener)
-        fight_map.events.register(GameEvent.DAMAGE_TAKEN, damage_listener)
+        scope = fight_map.figure_scope(hero.figure)
+        scope.register(GameEvent.DEFENSE_ROLL, defense_listener, source=hero.figure)
+        scope.register(GameEvent.DAMAGE_TAKEN, damage_listener, source=hero.figure)
 
 
 # ---------------------------------------------------------------------------
@@ -109,8 +104,6 @@ class GlacialBulwark(Item):
         hero.figure.add_effect('gb_charges', 1, overwrite=True)
 
         def defense_listener(**kwargs):
-            if kwargs.get('figure') != hero.figure:
-                return
             if kwargs.get('damage_type') != 'Physical':
                 return
             roll_data = kwargs['roll_data']
@@ -122,12 +115,11 @@ class GlacialBulwark(Item):
                     print(f"{hero.name}: Glacial Bulwark — re-rolled defense ({roll_data['value']}).")
 
         def activated_listener(**kwargs):
-            if kwargs.get('figure') != hero.figure:
-                return
             hero.figure.add_effect('gb_charges', 1, overwrite=True)
 
-        fight_map.events.register(GameEvent.DEFENSE_ROLL, defense_listener)
-        fight_map.events.register(GameEvent.HERO_ACTIVATED, activated_listener)
+        scope = fight_map.figure_scope(hero.figure)
+        scope.register(GameEvent.DEFENSE_ROLL, defense_listener, figure=hero.figure)
+        scope.register(GameEvent.HERO_ACTIVATED, activated_listener, figure=hero.figure)
 
 
 # ---------------------------------------------------------------------------
@@ -178,7 +170,7 @@ class ManaStormPotion(Item):
                     fight_map.events.deregister(GameEvent.HERO_TURN_START, listener_id_holder[0])
                     listener_id_holder[0] = None
 
-            lid = fight_map.events.register(GameEvent.HERO_TURN_START, reset_listener)
+            lid = fight_map.figure_scope(caster.figure).register(GameEvent.HERO_TURN_START, reset_listener)
             listener_id_holder[0] = lid
             print(f"{hero.name}: Mana Storm Potion — abilities cost 1 less this round.")
 
@@ -3,20 +3,182 @@ from figure import FigureType
 from events import EventManager
 from game_events import GameEvent
 from conditions import setup_condition_listeners
+from distance_cache import DistanceFieldCache
+from distance_repair import repair_cost_field
+from hierarchical_pathfinding import ClusterHierarchy
+import distance_transforms
+from turn_context import TurnContext
+from functools import lru_cache
+from array import array
+from collections import deque
+import heapq
 import math
 import random
 
+
+# One bit per FigureType, for the per-square type masks the pathfinding reads
+FIGURE_TYPE_BITS = {figure_type: 1 << i for i, figure_type in enumerate(FigureType)}
+
+
+def figure_type_mask(figure_types):
+    """Bitmask of a collection of FigureTypes (0 for None/empty)."""
+    mask = 0
+    for figure_type in figure_types or ():
+        mask |= FIGURE_TYPE_BITS[figure_type]
+    return mask
+
+
+HORVER_OFFSETS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIAG_OFFSETS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+
+
+@lru_cache(maxsize=None)
+def build_neighbor_tables(width, height):
+    """
+    Board squares in row-major order plus, per square index, tuples of its in-bounds
+    horizontal/vertical and diagonal neighbours. Built once per board size and shared by every
+    Map of that size; the neighbour tuples hold the same Coords objects as the squares tuple.
+    """
+    squares = tuple(Coords(x, y) for y in range(height) for x in range(width))
+
+    def neighbors(square, offsets):
+        return tuple(squares[(square.y + dy) * width + square.x + dx] for dx, dy in offsets
+                     if 0 <= square.x + dx < width and 0 <= square.y + dy < height)
+
+    horver = tuple(neighbors(square, HORVER_OFFSETS) for square in squares)
+    diag = tuple(neighbors(square, DIAG_OFFSETS) for square in squares)
+    return squares, horver, diag
+
+
+@lru_cache(maxsize=None)
+def build_index_tables(width, height):
+    """
+    build_neighbor_tables in square indexes (y * width + x): per square index, a tuple of its
+    horizontal/vertical neighbour indexes and a tuple of (neighbour, corner, corner) triples for
+    its diagonal neighbours, the corners being the two squares the diagonal cuts between.
+    """
+    horver = []
+    diag = []
+    for y in range(height):
+        for x in range(width):
+            horver.append(tuple((y + dy) * width + x + dx for dx, dy in HORVER_OFFSETS
+                                if 0 <= x + dx < width and 0 <= y + dy < height))
+            diag.append(tuple(((y + dy) * width + x + dx, y * width + x + dx, (y + dy) * width + x)
+                              for dx, dy in DIAG_OFFSETS if 0 <= x + dx < width and 0 <= y + dy < height))
+    return tuple(horver), tuple(diag)
+
+
+class GridRow:
+    """One row of a CellContentsView or GridView: row[x] reads the flat list at y * width + x, without copying the row."""
+    __slots__ = ('values', 'start', 'width')
+
+    def __init__(self, values, start, width):
+        self.values = values
+        self.start = start
+        self.width = width
+
+    def __getitem__(self, x):
+        if x < 0:
+            x += self.width
+        if not 0 <= x < self.width:
+            raise IndexError("column out of range")
+        return self.values[self.start + x]
+
+    def __len__(self):
+        return self.width
+
+    def __iter__(self):
+        return iter(self.values[self.start:self.start + self.width])
+
+
+class CellContentsView:
+    """
+    Map.cell_contents: rows of the flat Map.cells list, so cell_contents[y][x] is still the live
+    list of figures on (x, y). Rows are GridRow views, so reading one cell costs O(1).
+    """
+    def __init__(self, cells, width, height):
+        self.cells = cells
+        self.width = width
+        self.height = height
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("row out of range")
+        return GridRow(self.cells, y * self.width, self.width)
+
+    def __len__(self):
+        return self.height
+
+    def __iter__(self):
+        return (self[y] for y in range(self.height))
+
+
+class GridView(CellContentsView):
+    """
+    Map.hazard_grid and Map.type_mask_grid: rows of one of the flat per-square arrays, so
+    grid[y][x] is the current value for (x, y). Rows are read-only.
+    """
+
+
+def octile_distance(pos1, pos2):
+    """Floored 1/1.5 path cost between two squares on an open board (every second diagonal costs 2)."""
+    dx = abs(pos1.x - pos2.x)
+    dy = abs(pos1.y - pos2.y)
+    return max(dx, dy) + min(dx, dy) // 2
+
+
 class Map:
+    # Boards with a side at least this long answer long-range find_path queries through a ClusterHierarchy
+    hierarchy_min_size = 64
+    hierarchy_cluster_size = 10
+    # Debug check: report listener-count growth at the end of every round
+    check_listener_growth = False
+
     def __init__(self, encounter):
         self.encounter = encounter
         self.encounter.map = self
         self.width, self.height = encounter.get_map_dimensions()
-        self.figures = []
-        self.positions = {}  # Maps figures to their (x, y) coordinates
-        self.cell_contents = [[[] for _ in range(self.width)] for _ in range(self.height)]
+        # Figure indexes, all in add order (ids only grow, so that is also id order)
+        self.figures_by_id = {}
+        self.figures_by_type = {figure_type: {} for figure_type in FigureType}  # type -> {id: figure}
+        self.figures_by_name = {}  # name -> {id: figure}
+        self.figures_by_targeting = {}  # (TargetingContext, value) -> set of figure ids
+        self.positions = {}  # Maps figures to the Coords of their square (shared instances from self.squares)
+        # The board is flat: square (x, y) is index y * width + x (square_index) into these lists
+        area = self.width * self.height
+        self.cells = [[] for _ in range(area)]  # figures on each square, in placement order
+        # Per-square summaries of cells, kept in step by add/remove/relocate_figure
+        self.cell_hazards = array('l', [0]) * area  # summed hazard_damage
+        self.cell_masks = array('H', [0]) * area  # FIGURE_TYPE_BITS present
+        self.cell_contents = CellContentsView(self.cells, self.width, self.height)
+        self.hazard_grid = GridView(self.cell_hazards, self.width, self.height)
+        self.type_mask_grid = GridView(self.cell_masks, self.width, self.height)
         self.next_figure_id = 0
-        self.squares = [Coords(x, y) for y in range(self.height) for x in range(self.width)]
+        squares, self.horver_neighbors, self.diag_neighbors = build_neighbor_tables(self.width, self.height)
+        self.squares = list(squares)
+        self.horver_indexes, self.diag_indexes = build_index_tables(self.width, self.height)
         self.events = EventManager()
+        self.version = 0  # Bumped whenever a figure is added, removed or moved
+        self.type_versions = {figure_type: 0 for figure_type in FigureType}  # The same, per figure type
+        self.square_changes = deque(maxlen=512)  # (figure type, squares) per version bump, latest last
+        self.distance_cache = DistanceFieldCache()
+        self.approach_cache = DistanceFieldCache()  # get_approach_field results, keyed by goal square
+        self.search_count = 0  # Path searches run so far (bfs, distance fields, bfs_with_hazards)
+        self.turn_context = None  # The running boss turn's TurnContext
+        self.stats_epoch = 0  # Bumped at turn boundaries, so cached derived stats (Figure.move) are recomputed
+        self.hierarchies = {}  # frozenset(impassible_types) -> ClusterHierarchy, large boards only
+        # Registered before anything else so later listeners already see updated cluster hierarchies
+        self.events.register(GameEvent.FIGURE_ADDED, self._on_figure_placed)
+        self.events.register(GameEvent.FIGURE_REMOVED, self._on_figure_placed)
+        self.events.register(GameEvent.FIGURE_MOVED, self._on_figure_moved)
+        # Listener lifetimes: each scope deregisters its listeners in one go (see end_round,
+        # remove_figure and end_fight)
+        self.fight_scope = self.events.scope('fight')
+        self.round_scope = self.events.scope('round 1')
+        self.figure_scopes = {}  # figure -> ListenerScope, disposed when the figure leaves the map
+        self.listener_count_history = []  # self.events.listener_counts() after each round, when checked
 
         self.encounter.setup_map(self)
         self.heroes_activated = 0
@@ -25,6 +187,33 @@ class Map:
         # the general condition handlers
         setup_condition_listeners(self)
 
+    @property
+    def figures(self):
+        """
+        All figures on the map, in the order they were added, as a fresh list for callers that
+        change the map while iterating. Read-only loops iterate figures_by_id.values() instead.
+        """
+        return list(self.figures_by_id.values())
+
+    def has_figure(self, figure):
+        return self.figures_by_id.get(getattr(figure, 'id', None)) is figure
+
+    def index_targeting(self, figure):
+        for context, value in figure.targeting_parameters.items():
+            self.index_targeting_value(figure, context, value)
+
+    def unindex_targeting(self, figure):
+        for context, value in figure.targeting_parameters.items():
+            self.unindex_targeting_value(figure, context, value)
+
+    def index_targeting_value(self, figure, context, value):
+        if self.has_figure(figure):
+            self.figures_by_targeting.setdefault((context, value), set()).add(figure.id)
+
+    def unindex_targeting_value(self, figure, context, value):
+        if self.has_figure(figure):
+            self.figures_by_targeting.get((context, value), set()).discard(figure.id)
+
     def get_next_figure_id(self):
         figure_id = self.next_figure_id
         self.next_figure_id += 1
@@ -39,7 +228,7 @@ class Map:
                 continue
             visited.add(current)
             # Check if the square is open
-            if not self.cell_contents[current.y][current.x]:
+            if not self.cells[self.square_index(current)]:
                 return current
             # Add neighbors to the queue
             for neighbor in self.get_horver_neighbors(current) + self.get_diag_neighbors(current):
@@ -51,10 +240,9 @@ class Map:
     def add_figure(self, figure, coords, on_occupied='fail'):
         figure.map = self
         figure.id = self.get_next_figure_id()
-        self.figures.append(figure)
         if not self.coords_in_bounds(coords):
             raise ValueError("Coordinates out of bounds")
-        current_contents = self.cell_contents[coords.y][coords.x]
+        current_contents = self.cells[self.square_index(coords)]
         blocking = [c for c in current_contents if c.figure_type != FigureType.MARKER]
         if blocking:
             if on_occupied == 'displace':
@@ -82,8 +270,17 @@ class Map:
                 raise ValueError(f"Unknown on_occupied action: {on_occupied}")
 
 
-        self.cell_contents[coords.y][coords.x].append(figure)
+        # Indexed only now, so no listener of the checks above (a displaced figure's FIGURE_MOVED)
+        # sees a figure without a position, and a failed add leaves nothing behind
+        coords = self.intern_coords(coords)
+        self.figures_by_id[figure.id] = figure
+        self.figures_by_type[figure.figure_type][figure.id] = figure
+        self.figures_by_name.setdefault(figure.name, {})[figure.id] = figure
+        self.index_targeting(figure)
+        self.cells[self.square_index(coords)].append(figure)
         self.positions[figure] = coords
+        self.refresh_square(coords)
+        self.bump_version(figure, (coords,))
 
         if figure.figure_type == FigureType.HERO:
             for ability in figure.hero.abilities:
@@ -93,13 +290,37 @@ class Map:
         self.events.trigger(GameEvent.FIGURE_ADDED, figure=figure, coords=coords)
         
     def remove_figure(self, figure):
-        if figure not in self.figures:
+        if not self.has_figure(figure):
             raise ValueError("Figure not found on the map")
         coords = self.positions[figure]
-        self.cell_contents[coords.y][coords.x].remove(figure)
+        self.cells[self.square_index(coords)].remove(figure)
         del self.positions[figure]
-        self.figures.remove(figure)
+        self.unindex_targeting(figure)
+        del self.figures_by_id[figure.id]
+        del self.figures_by_type[figure.figure_type][figure.id]
+        named = self.figures_by_name[figure.name]
+        del named[figure.id]
+        if not named:
+            del self.figures_by_name[figure.name]
+        self.refresh_square(coords)
+        self.bump_version(figure, (coords,))
         self.events.trigger(GameEvent.FIGURE_REMOVED, figure=figure, coords=Coords(x=coords.x, y=coords.y))
+        scope = self.figure_scopes.pop(figure, None)
+        if scope is not None:
+            scope.dispose()
+
+    def figure_scope(self, figure):
+        """
+        The ListenerScope for listeners bound to figure; disposed right after FIGURE_REMOVED fires for it.
+        A figure that has already left this map gets the fight scope instead, since nothing would
+        dispose its own; a hero not placed yet (its items are applied first) gets its own scope.
+        """
+        scope = self.figure_scopes.get(figure)
+        if scope is None:
+            if figure.map is self and not self.has_figure(figure):
+                return self.fight_scope
+            scope = self.figure_scopes[figure] = self.events.scope(f'figure {figure.name}')
+        return scope
 
     def move_figure(self, figure, coords, path=None):
         """
@@ -111,7 +332,7 @@ class Map:
             path: Optional list of coordinates representing the path (includes start and end)
                   If provided, figure will take hazard damage along the path
         """
-        if figure not in self.figures:
+        if not self.has_figure(figure):
             raise ValueError("Figure not found on the map")
         old_coords = self.positions[figure]
         
@@ -145,7 +366,7 @@ class Map:
                 # Use a generic hazard source (first hazard figure found, or None)
                 hazard_source = None
                 for step in path[1:]:
-                    for fig in self.cell_contents[step.y][step.x]:
+                    for fig in self.cells[self.square_index(step)]:
                         if fig.hazard_damage > 0:
                             hazard_source = fig
                             break
@@ -157,22 +378,53 @@ class Map:
                     print(f"{figure.name} takes {damage_dealt} elemental damage from hazards!")
         
         # Execute the movement
-        self.cell_contents[old_coords.y][old_coords.x].remove(figure)
-        self.cell_contents[coords.y][coords.x].append(figure)
-        self.positions[figure] = coords
+        self.relocate_figure(figure, coords)
         self.events.trigger(GameEvent.FIGURE_MOVED, figure=figure, old_coords=old_coords, new_coords=coords)
 
+    def relocate_figure(self, figure, coords):
+        """Reposition a figure without hazards or events (move_figure and snapshot restore use this)."""
+        old_coords = self.positions[figure]
+        coords = self.intern_coords(coords)
+        self.cells[self.square_index(old_coords)].remove(figure)
+        self.cells[self.square_index(coords)].append(figure)
+        self.positions[figure] = coords
+        self.refresh_square(old_coords)
+        self.refresh_square(coords)
+        self.bump_version(figure, (old_coords, coords))
+
+    def bump_version(self, figure, squares):
+        """Record that figure was added to, removed from or moved between squares."""
+        self.version += 1
+        self.type_versions[figure.figure_type] += 1
+        self.square_changes.append((figure.figure_type, squares))
+
+    def blocking_version(self, impassible_types):
+        """Changes whenever a figure of one of these types is added, removed or moved (and only then)."""
+        return sum(self.type_versions[figure_type] for figure_type in impassible_types or ())
+
+    def square_index(self, coords):
+        """Index of an in-bounds square in the flat board lists (squares, cells, cell_masks, cell_hazards)."""
+        return coords.y * self.width + coords.x
+
+    def refresh_square(self, coords):
+        """Recompute cell_hazards and cell_masks for one square from its contents."""
+        index = self.square_index(coords)
+        hazard = 0
+        mask = 0
+        for figure in self.cells[index]:
+            hazard += figure.hazard_damage
+            mask |= FIGURE_TYPE_BITS[figure.figure_type]
+        self.cell_hazards[index] = hazard
+        self.cell_masks[index] = mask
+
     def get_figure_position(self, figure):
         return self.positions.get(figure)
 
     def get_square_contents(self, coords):
-        return self.cell_contents[coords.y][coords.x]
+        return self.cells[self.square_index(coords)]
     
     def get_figure_by_id(self, figure_id):
-        for figure in self.figures:
-            if figure.id == figure_id:
-                return figure
-        return None
+        return self.figures_by_id.get(figure_id)
     
     def get_figures_by_type(self, figure_type, targeting_filters=None):
         """
@@ -188,56 +440,100 @@ class Map:
         """
         # Handle both single type and list of types
         if isinstance(figure_type, list):
-            figures = [figure for figure in self.figures if figure.figure_type in figure_type]
+            # Each per-type index is in id order, so merging on id keeps the overall map order
+            indexes = [self.figures_by_type[t].items() for t in dict.fromkeys(figure_type)]
+            figures = [figure for _, figure in heapq.merge(*indexes, key=lambda item: item[0])]
         else:
-            figures = [figure for figure in self.figures if figure.figure_type == figure_type]
+            figures = list(self.figures_by_type[figure_type].values())
         
-        # Apply targeting parameter filters if provided
+        # Apply targeting parameter filters if provided: intersect the per-(context, value) id sets
         if targeting_filters:
-            filtered_figures = []
-            for figure in figures:
-                matches_all_filters = True
-                for context, expected_value in targeting_filters.items():
-                    if figure.targeting_parameters[context] != expected_value:
-                        matches_all_filters = False
-                        break
-                if matches_all_filters:
-                    filtered_figures.append(figure)
-            return filtered_figures
+            matching_ids = None
+            for context, expected_value in targeting_filters.items():
+                ids = self.figures_by_targeting.get((context, expected_value), set())
+                matching_ids = ids if matching_ids is None else matching_ids & ids
+            return [figure for figure in figures if figure.id in matching_ids]
         
         return figures
 
     def get_figures_by_name(self, name):
-        return [figure for figure in self.figures if figure.name == name]
+        return list(self.figures_by_name.get(name, {}).values())
 
     def get_figures_within_distance(self, coords, distance, impassible_types=None):
-        return [figure for figure in self.figures if figure.position is not None and self.distance_between(coords, figure.position, impassible_types=None) <= distance]
+        # Range is measured ignoring blockers, as it always has been for attacks and AoEs
+        positions = self.positions
+        if self.coords_in_bounds(coords):
+            return [figure for figure in self.figures_by_id.values()
+                    if figure in positions and octile_distance(coords, positions[figure]) <= distance]
+        # One bounded search from coords, then read off whoever stands in the reached squares
+        reached, _ = self._dijkstra(coords, max_distance=distance)
+        return [figure for figure in self.figures_by_id.values() if positions.get(figure) in reached]
 
     def get_squares_within_distance(self, coords, distance, impassible_types=None):
-        return [square for square in self.squares if self.distance_between(coords, square, impassible_types=impassible_types) <= distance]
+        if self.coords_in_bounds(coords) and self._is_unobstructed(impassible_types):
+            return self._squares_within_octile_distance(coords, distance)
+        if distance_transforms.available(self, coords, distance):
+            return distance_transforms.squares_in_range(self, coords, figure_type_mask(impassible_types), distance, blocked_endpoints=True)
+        # One depth-limited search; squares holding impassible figures are reachable endpoints, as in distance_between
+        reached, _ = self._dijkstra(coords, impassible_types, max_distance=distance, blocked_endpoints=True)
+        return sorted(reached, key=lambda square: (square.y, square.x))
+
+    def _is_unobstructed(self, impassible_types):
+        """True when nothing on the map blocks these types, so distances depend only on dx/dy."""
+        return not impassible_types or not any(self.figures_by_type[figure_type] for figure_type in impassible_types)
+
+    def _squares_within_octile_distance(self, coords, distance):
+        """Open-board range query: scan the bounding box instead of searching. Row-major order."""
+        distance = int(distance)
+        squares = []
+        for y in range(max(0, coords.y - distance), min(self.height, coords.y + distance + 1)):
+            for x in range(max(0, coords.x - distance), min(self.width, coords.x + distance + 1)):
+                square = self.squares[y * self.width + x]
+                if octile_distance(coords, square) <= distance:
+                    squares.append(square)
+        return squares
+
+    def _squares_within_octile_reach(self, coords, distance):
+        """
+        Open-board squares_within_distance: bfs's reach is every square whose unfloored cost
+        (max(dx, dy) + min(dx, dy) / 2) is at most distance + 1.5. Row-major order.
+        """
+        reach = int(distance) + 1
+        squares = []
+        for y in range(max(0, coords.y - reach), min(self.height, coords.y + reach + 1)):
+            for x in range(max(0, coords.x - reach), min(self.width, coords.x + reach + 1)):
+                dx, dy = abs(x - coords.x), abs(y - coords.y)
+                if 2 * max(dx, dy) + min(dx, dy) <= 2 * distance + 3:
+                    squares.append(self.squares[y * self.width + x])
+        return squares
 
     def coords_in_bounds(self, coords):
         return 0 <= coords.x < self.width and 0 <= coords.y < self.height
 
     def get_horver_neighbors(self, coords):
+        """In-bounds horizontal/vertical neighbours as a shared tuple; do not mutate."""
         x, y = coords.x, coords.y
-        neighbors = [c for c in [
-            Coords(x+1, y),
-            Coords(x-1, y),
-            Coords(x, y+1),
-            Coords(x, y-1),
-        ] if self.coords_in_bounds(c)]
-        return neighbors
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.horver_neighbors[y * self.width + x]
+        return self._offboard_neighbors(coords, HORVER_OFFSETS)
 
     def get_diag_neighbors(self, coords):
+        """In-bounds diagonal neighbours as a shared tuple; do not mutate."""
         x, y = coords.x, coords.y
-        neighbors = [c for c in [
-            Coords(x+1, y+1),
-            Coords(x-1, y+1),
-            Coords(x+1, y-1),
-            Coords(x-1, y-1),
-        ] if self.coords_in_bounds(c)]
-        return neighbors
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.diag_neighbors[y * self.width + x]
+        return self._offboard_neighbors(coords, DIAG_OFFSETS)
+
+    def intern_coords(self, coords):
+        """The board's shared Coords instance for an in-bounds square (off-board coords pass through)."""
+        if 0 <= coords.x < self.width and 0 <= coords.y < self.height:
+            return self.squares[coords.y * self.width + coords.x]
+        return coords
+
+    def _offboard_neighbors(self, coords, offsets):
+        # Searches may start just off the board (e.g. range checks from an edge); not worth a table
+        return tuple(self.squares[(coords.y + dy) * self.width + coords.x + dx] for dx, dy in offsets
+                     if 0 <= coords.x + dx < self.width and 0 <= coords.y + dy < self.height)
 
     def can_move_diagonal(self, from_coords, to_coords, impassible_types):
         """Check if diagonal movement is allowed and return (allowed, extra_hazard_damage)"""
@@ -247,85 +543,246 @@ class Map:
         assert abs(dx) == 1 and abs(dy) == 1, \
             f"can_move_diagonal called with non-diagonal coordinates: from {from_coords} to {to_coords}"
         
-        adj1 = Coords(to_coords.x, from_coords.y)
-        adj2 = Coords(from_coords.x, to_coords.y)
-        
-        # Check both adjacent squares
-        adj1_blocked = any(figure.figure_type in impassible_types for figure in self.cell_contents[adj1.y][adj1.x])
-        adj2_blocked = any(figure.figure_type in impassible_types for figure in self.cell_contents[adj2.y][adj2.x])
+        return self._diagonal_crossing(from_coords, to_coords, figure_type_mask(impassible_types))
+
+    def _diagonal_crossing(self, from_coords, to_coords, blocking_mask):
+        """can_move_diagonal for a precomputed impassible-type mask, without the argument check."""
+        # The two squares the diagonal cuts between: (to.x, from.y) and (from.x, to.y); a corner
+        # off the board (a search starting just outside it) counts as open and hazard-free
+        corner1 = self._index_or_none(to_coords.x, from_coords.y)
+        corner2 = self._index_or_none(from_coords.x, to_coords.y)
+        adj1_blocked = corner1 is not None and self.cell_masks[corner1] & blocking_mask
+        adj2_blocked = corner2 is not None and self.cell_masks[corner2] & blocking_mask
+        hazard1 = self.cell_hazards[corner1] if corner1 is not None else 0
+        hazard2 = self.cell_hazards[corner2] if corner2 is not None else 0
         
         # If both squares are blocked, cannot move diagonally
         if adj1_blocked and adj2_blocked:
             return False, 0
         
         # If at least one is passable, can move
-        # But if crossing through hazards, take the damage from whichever is lower
-        adj1_hazard = 999999 if adj1_blocked else 0
-        for fig in self.cell_contents[adj1.y][adj1.x]:
-            adj1_hazard += fig.hazard_damage
-        adj2_hazard = 999999 if adj2_blocked else 0
-        for fig in self.cell_contents[adj2.y][adj2.x]:
-            adj2_hazard += fig.hazard_damage
-        
-        return True, min(adj1_hazard, adj2_hazard)  # Take the lesser hazard damage of the two
+        # But if crossing through hazards, take the damage from whichever passable square is lower
+        if adj1_blocked:
+            return True, hazard2
+        if adj2_blocked:
+            return True, hazard1
+        return True, min(hazard1, hazard2)
+
+    def _index_or_none(self, x, y):
+        return y * self.width + x if 0 <= x < self.width and 0 <= y < self.height else None
+
+    def _offboard_start_steps(self, start, blocking_mask):
+        """(neighbour index, step cost) for each first step of a search starting off the board."""
+        steps = [(self.square_index(neighbor), 1) for neighbor in self.get_horver_neighbors(start)]
+        steps += [(self.square_index(neighbor), 1.5) for neighbor in self.get_diag_neighbors(start)
+                  if self._diagonal_crossing(start, neighbor, blocking_mask)[0]]
+        return steps
 
     def bfs(self, start, impassible_types=None, max_distance=None, target=None, return_paths=False, tiebreaker_target=None):
+        """
+        Uniform-cost (Dijkstra) search from start.
+        Horizontal/vertical steps cost 1 and diagonal steps cost 1.5, so flooring the
+        accumulated cost reproduces the D&D 1-2-1 diagonal rule.
+
+        Args:
+            start: Starting coordinates
+            impassible_types: Set of FigureTypes that block movement (the target square is always enterable)
+            max_distance: Squares costing more than this are still recorded but not expanded, so the
+                result also holds the first ring of squares beyond it (the reach squares_within_distance
+                has always had)
+            target: Stop as soon as this square is settled
+            return_paths: Also return the came_from parent map
+            tiebreaker_target: Among equal-cost parents, prefer the one closest (pythagorean) to this square
+
+        Returns:
+            dict mapping each settled coord to its floored cost (and came_from if return_paths)
+        """
+        visited, came_from = self._dijkstra(start, impassible_types, max_distance=max_distance, target=target, tiebreaker_target=tiebreaker_target, frontier=True)
+        # Floor all costs to match D&D rounding
+        costs = {coord: int(cost) for coord, cost in visited.items()}
+        if return_paths:
+            return costs, came_from
+        return costs
+
+    def _dijkstra(self, start, impassible_types=None, max_distance=None, target=None, tiebreaker_target=None, blocked_endpoints=False, targets=None, frontier=False):
+        """
+        Search engine behind bfs and the distance fields. Returns (unfloored costs, came_from).
+        max_distance keeps the squares whose floored cost is within it; with frontier, squares whose
+        unfloored cost exceeds it are settled but not expanded instead (bfs's reach).
+        With blocked_endpoints, squares holding impassible figures are settled (as if each were
+        the target) but never expanded, so one search answers distance_between for every square.
+        With targets (a set of squares), stop once all of them are settled or once the floored
+        cost passes the nearest settled one, so the nearest target and its ties are all settled.
+        The search runs on square indexes; both dicts are keyed by the board's Coords, in the
+        order squares were settled.
+        """
         if impassible_types is None:
             impassible_types = set()
+        self.search_count += 1
+        blocking_mask = figure_type_mask(impassible_types)
+        cell_masks = self.cell_masks
+        horver_indexes = self.horver_indexes
+        diag_indexes = self.diag_indexes
+        squares = self.squares
+        start = self.intern_coords(start)
+        on_board = self.coords_in_bounds(start)
+        start_index = self.square_index(start) if on_board else -1  # -1 stands for an off-board start
+        target_index = self.square_index(target) if target is not None and self.coords_in_bounds(target) else None
+        best = {start_index: 0.0}
         visited = {}
         came_from = {}
-        queue = [(start, 0.0)]
+        counter = 0
+        queue = [(0.0, counter, start_index)]
+        remaining_targets = ({self.square_index(square) for square in targets if self.coords_in_bounds(square)}
+                             if targets is not None else None)
+        nearest_target_cost = None
+        prune_distance = None if frontier else max_distance
+
+        def relax(current, neighbor, new_cost):
+            nonlocal counter
+            if prune_distance is not None and int(new_cost) > prune_distance:
+                return
+            known_cost = best.get(neighbor)
+            if known_cost is None or new_cost < known_cost:
+                best[neighbor] = new_cost
+                came_from[neighbor] = current
+                counter += 1
+                heapq.heappush(queue, (new_cost, counter, neighbor))
+            elif new_cost == known_cost and tiebreaker_target is not None:
+                # Use pythagorean distance as tiebreaker
+                current_parent = squares[came_from[neighbor]] if came_from[neighbor] >= 0 else start
+                new_parent = squares[current] if current >= 0 else start
+                current_dist = math.sqrt((current_parent.x - tiebreaker_target.x) ** 2 + (current_parent.y - tiebreaker_target.y) ** 2)
+                new_dist = math.sqrt((new_parent.x - tiebreaker_target.x) ** 2 + (new_parent.y - tiebreaker_target.y) ** 2)
+                if new_dist < current_dist:
+                    came_from[neighbor] = current
+
         while queue:
-            current, cost = queue.pop(0)
+            cost, _, current = heapq.heappop(queue)
             if current in visited:
                 continue
+            if nearest_target_cost is not None and int(cost) > nearest_target_cost:
+                break
             visited[current] = cost
-            if max_distance is not None and cost > max_distance:
+            if frontier and max_distance is not None and cost > max_distance:
                 continue
-            if target is not None and current == target:
+            if current == target_index:
                 break
-            for neighbor in self.get_horver_neighbors(current):
-                if (
-                    neighbor not in visited
-                    and (neighbor == target or not any(figure.figure_type in impassible_types for figure in self.cell_contents[neighbor.y][neighbor.x]))
-                ):
-                    queue.append((neighbor, cost + 1))
-                    if neighbor not in came_from:
-                        came_from[neighbor] = current
-                    elif tiebreaker_target is not None:
-                        # Use pythagorean distance as tiebreaker
-                        current_parent = came_from[neighbor]
-                        current_dist = math.sqrt((current_parent.x - tiebreaker_target.x) ** 2 + (current_parent.y - tiebreaker_target.y) ** 2)
-                        new_dist = math.sqrt((current.x - tiebreaker_target.x) ** 2 + (current.y - tiebreaker_target.y) ** 2)
-                        if new_dist < current_dist:
-                            came_from[neighbor] = current
-            for neighbor in self.get_diag_neighbors(current):
-                can_move, _ = self.can_move_diagonal(current, neighbor, impassible_types)
+            if remaining_targets is not None and current in remaining_targets:
+                remaining_targets.discard(current)
+                if nearest_target_cost is None:
+                    nearest_target_cost = int(cost)
+                if not remaining_targets:
+                    break
+            if current < 0:
+                for neighbor, step_cost in self._offboard_start_steps(start, blocking_mask):
+                    if blocked_endpoints or neighbor == target_index or not cell_masks[neighbor] & blocking_mask:
+                        relax(current, neighbor, cost + step_cost)
+                continue
+            if blocked_endpoints and current != start_index and cell_masks[current] & blocking_mask:
+                continue
+            for neighbor in horver_indexes[current]:
                 if (
                     neighbor not in visited
-                    and can_move
-                    and (neighbor == target or not any(figure.figure_type in impassible_types for figure in self.cell_contents[neighbor.y][neighbor.x]))
+                    and (blocked_endpoints or neighbor == target_index or not cell_masks[neighbor] & blocking_mask)
                 ):
-                    queue.append((neighbor, cost + 1.5))
-                    if neighbor not in came_from:
-                        came_from[neighbor] = current
-                    elif tiebreaker_target is not None:
-                        # Use pythagorean distance as tiebreaker
-                        current_parent = came_from[neighbor]
-                        current_dist = math.sqrt((current_parent.x - tiebreaker_target.x) ** 2 + (current_parent.y - tiebreaker_target.y) ** 2)
-                        new_dist = math.sqrt((current.x - tiebreaker_target.x) ** 2 + (current.y - tiebreaker_target.y) ** 2)
-                        if new_dist < current_dist:
-                            came_from[neighbor] = current
-        # Floor all costs to match D&D rounding
-        costs = {coord: int(cost) for coord, cost in visited.items()}
-        if return_paths:
-            return costs, came_from
-        return costs
+                    relax(current, neighbor, cost + 1)
+            for neighbor, corner1, corner2 in diag_indexes[current]:
+                if neighbor in visited:
+                    continue
+                if cell_masks[corner1] & blocking_mask and cell_masks[corner2] & blocking_mask:
+                    continue
+                if blocked_endpoints or neighbor == target_index or not cell_masks[neighbor] & blocking_mask:
+                    relax(current, neighbor, cost + 1.5)
+        if on_board:
+            return ({squares[index]: cost for index, cost in visited.items()},
+                    {squares[index]: squares[parent] for index, parent in came_from.items()})
+        return ({squares[index] if index >= 0 else start: cost for index, cost in visited.items()},
+                {squares[index]: squares[parent] if parent >= 0 else start for index, parent in came_from.items()})
+
+    def _is_blocked(self, coords, impassible_types):
+        index = self._index_or_none(coords.x, coords.y)
+        return index is not None and bool(self.cell_masks[index] & figure_type_mask(impassible_types))
+
+    def get_distance_field(self, origin, impassible_types=None):
+        """
+        Floored distance from origin to every reachable square, as distance_between would report it
+        (squares holding impassible figures are included as endpoints). Served from the distance
+        cache until a figure of an impassible type is added, removed or moved; treat the returned
+        dict as read-only.
+        """
+        return self._cached_fields(origin, impassible_types)[1]
+
+    def get_cost_field(self, origin, impassible_types=None):
+        """The unfloored costs behind get_distance_field (1 per straight step, 1.5 per diagonal)."""
+        return self._cached_fields(origin, impassible_types)[0]
+
+    def _cached_fields(self, origin, impassible_types):
+        """(costs, floored distances, self.version they were computed at) for origin, from the cache."""
+        key = self.distance_cache.make_key(origin, impassible_types)
+        version = self.blocking_version(impassible_types)
+        fields = self.distance_cache.get(key, version)
+        if fields is None:
+            fields = self._repaired_fields(key)
+            if fields is not None:
+                self.distance_cache.replace(key, version, fields)
+            else:
+                costs, _ = self._dijkstra(origin, impassible_types, blocked_endpoints=True)
+                fields = (costs, {coord: int(cost) for coord, cost in costs.items()}, self.version)
+                self.distance_cache.put(key, version, fields)
+        return fields
+
+    def _repaired_fields(self, key):
+        """
+        The outdated fields cached for key, repaired around the squares where figures they are
+        blocked by came or went since they were computed (see repair_cost_field). None when they
+        should be recomputed instead: nothing is cached, the changes are no longer all in
+        square_changes, or the squares to repair around outnumber the squares in the field.
+        Repair is done here, when a field is read again, so fields nobody reads cost nothing.
+        """
+        entry = self.distance_cache.entries.get(key)
+        if entry is None:
+            return None
+        costs, floored, version = entry[1]
+        missed = self.version - version
+        if missed > len(self.square_changes):
+            return None
+        origin, impassible_types = key
+        squares = set()
+        for index in range(len(self.square_changes) - missed, len(self.square_changes)):
+            figure_type, changed = self.square_changes[index]
+            if figure_type in impassible_types:
+                squares.update(changed)
+        if 9 * len(squares) > len(costs):  # each square's repair region is it and its neighbours
+            return None
+        if squares:
+            costs = dict(costs)  # fields already handed out stay as they were
+            floored = dict(floored)
+            for square in repair_cost_field(self, origin, figure_type_mask(impassible_types), costs, squares):
+                if square in costs:
+                    floored[square] = int(costs[square])
+                else:
+                    del floored[square]
+        return (costs, floored, self.version)
+
+    def _on_figure_placed(self, figure, coords):
+        self._squares_changed(figure, [coords])
+
+    def _on_figure_moved(self, figure, old_coords, new_coords):
+        self._squares_changed(figure, [old_coords, new_coords])
+
+    def _squares_changed(self, figure, squares):
+        for hierarchy in self.hierarchies.values():
+            hierarchy.squares_changed(figure.figure_type, squares)
 
     def bfs_with_hazards(self, start, impassible_types=None, max_distance=None, figure=None, valid_directions=None):
         """
         Enhanced BFS that tracks optimal paths considering both movement cost and hazard damage.
         Uses D&D movement rules: diagonal moves alternate between costing 1 and 2 move points.
+
+        This is a label-setting multi-objective search over (square, next_diag_expensive) states:
+        two labels on the same square only compete if they agree on what the next diagonal costs
+        (or one is no worse on cost, hazard *and* parity).
         
         Args:
             start: Starting coordinates
@@ -344,45 +801,56 @@ class Map:
         """
         if impassible_types is None:
             impassible_types = set()
+        self.search_count += 1
+        blocking_mask = figure_type_mask(impassible_types)
+        cell_masks = self.cell_masks
+        cell_hazards = self.cell_hazards
+        width = self.width
         
-        # Track ALL Pareto-optimal paths to each square
-        # Each square maps to a list of non-dominated (move_cost, hazard_damage, path) tuples
-        pareto_paths = {}  # coord -> [(cost, hazard, path), ...]
+        # Search labels are (coord, parent label index); paths are rebuilt from these parent
+        # pointers at the end instead of copying a path list into every queue entry
+        start = self.intern_coords(start)
+        labels = [(start, None)]
         
-        # Priority queue: (hazard_damage, move_cost, counter, current_pos, path, next_diag_expensive)
-        import heapq
+        # Settled Pareto-optimal labels per state: (coord, next_diag_expensive) -> [(cost, hazard, label), ...]
+        # Labels are popped in (hazard, cost) order, so a settled label can never be dominated later
+        pareto_labels = {}
+
+        def dominated(coord, next_diag_expensive, cost, hazard):
+            # Same parity: plain (cost, hazard) dominance
+            for settled_cost, settled_hazard, _ in pareto_labels.get((coord, next_diag_expensive), ()):
+                if settled_cost <= cost and settled_hazard <= hazard:
+                    return True
+            # A label whose next diagonal is cheap is never worse than an expensive-next one with the
+            # same cost, and an expensive-next label is at most 1 move behind over any continuation
+            parity_offset = 0 if next_diag_expensive else 1
+            for settled_cost, settled_hazard, _ in pareto_labels.get((coord, not next_diag_expensive), ()):
+                if settled_cost + parity_offset <= cost and settled_hazard <= hazard:
+                    return True
+            return False
+
+        # Priority queue: (hazard_damage, move_cost, counter, label, next_diag_expensive)
         counter = 0
-        queue = [(0, 0, counter, start, [start], False)]
+        queue = [(0, 0, counter, 0, False)]
+
+        def push(neighbor, label, new_cost, new_hazard, next_diag_expensive):
+            nonlocal counter
+            if max_distance is not None and new_cost > max_distance:
+                return
+            if dominated(neighbor, next_diag_expensive, new_cost, new_hazard):
+                return
+            labels.append((neighbor, label))
+            counter += 1
+            heapq.heappush(queue, (new_hazard, new_cost, counter, len(labels) - 1, next_diag_expensive))
         
         while queue:
-            current_hazard, current_cost, _, current, path, next_diag_expensive = heapq.heappop(queue)
+            current_hazard, current_cost, _, label, next_diag_expensive = heapq.heappop(queue)
+            current = labels[label][0]
             
-            # Skip if this destination exceeds max distance
-            if max_distance is not None and current_cost > max_distance:
+            # Skip if a label settled since this one was queued dominates it
+            if dominated(current, next_diag_expensive, current_cost, current_hazard):
                 continue
-            
-            # Check if this path is dominated by existing paths to this square
-            if current in pareto_paths:
-                # Skip if any existing path is strictly better in both metrics
-                dominated = False
-                for existing_cost, existing_hazard, _ in pareto_paths[current]:
-                    if existing_cost <= current_cost and existing_hazard <= current_hazard:
-                        # This path is dominated, skip it
-                        dominated = True
-                        break
-                if dominated:
-                    continue
-                
-                # Remove any existing paths that this path dominates
-                pareto_paths[current] = [
-                    (c, h, p) for c, h, p in pareto_paths[current]
-                    if not (current_cost <= c and current_hazard <= h)
-                ]
-            else:
-                pareto_paths[current] = []
-            
-            # Add this path to the Pareto set
-            pareto_paths[current].append((current_cost, current_hazard, path.copy()))
+            pareto_labels.setdefault((current, next_diag_expensive), []).append((current_cost, current_hazard, label))
             
             # Don't expand further if we've hit max distance
             if max_distance is not None and current_cost >= max_distance:
@@ -397,13 +865,10 @@ class Map:
                     if (dx, dy) not in valid_directions:
                         continue
                 
-                if not any(fig.figure_type in impassible_types for fig in self.cell_contents[neighbor.y][neighbor.x]):
-                    new_cost = current_cost + 1
-                    new_hazard = current_hazard + self._get_hazard_damage(neighbor, figure)
-                    new_path = path + [neighbor]
-                    counter += 1
+                neighbor_index = neighbor.y * width + neighbor.x
+                if not cell_masks[neighbor_index] & blocking_mask:
                     # Horizontal/vertical moves don't change the diagonal cost alternation
-                    heapq.heappush(queue, (new_hazard, new_cost, counter, neighbor, new_path, next_diag_expensive))
+                    push(neighbor, label, current_cost + 1, current_hazard + cell_hazards[neighbor_index], next_diag_expensive)
             
             # Explore diagonal neighbors (alternate between cost 1 and 2)
             for neighbor in self.get_diag_neighbors(current):
@@ -414,46 +879,55 @@ class Map:
                     if (dx, dy) not in valid_directions:
                         continue
                 
-                can_move, crossing_hazard = self.can_move_diagonal(current, neighbor, impassible_types)
-                if (can_move and
-                    not any(fig.figure_type in impassible_types for fig in self.cell_contents[neighbor.y][neighbor.x])):
+                can_move, crossing_hazard = self._diagonal_crossing(current, neighbor, blocking_mask)
+                neighbor_index = neighbor.y * width + neighbor.x
+                if can_move and not cell_masks[neighbor_index] & blocking_mask:
                     # D&D rules: first diagonal costs 1, second costs 2, third costs 1, etc.
                     diag_cost = 2 if next_diag_expensive else 1
-                    new_cost = current_cost + diag_cost
-                    # Add hazard from destination square AND from crossing diagonal
-                    new_hazard = current_hazard + self._get_hazard_damage(neighbor, figure) + crossing_hazard
-                    new_path = path + [neighbor]
-                    counter += 1
-                    # Toggle the diagonal cost for the next diagonal move
-                    heapq.heappush(queue, (new_hazard, new_cost, counter, neighbor, new_path, not next_diag_expensive))
+                    # Add hazard from destination square AND from crossing diagonal, and toggle the diagonal cost
+                    new_hazard = current_hazard + cell_hazards[neighbor_index] + crossing_hazard
+                    push(neighbor, label, current_cost + diag_cost, new_hazard, not next_diag_expensive)
         
-        # Convert Pareto paths to the expected return format
+        # Convert the Pareto labels to the expected return format
         # For each square, choose the "best" path: prefer lowest cost, then lowest hazard
         # This maximizes movement efficiency (leaves more movement for further actions)
+        best_labels = {}
+        for (coord, next_diag_expensive), settled in pareto_labels.items():
+            for cost, hazard, label in settled:
+                key = (cost, hazard, next_diag_expensive)
+                if coord not in best_labels or key < best_labels[coord][0]:
+                    best_labels[coord] = (key, label)
         best_paths = {}
-        for coord, paths in pareto_paths.items():
-            # Sort by (cost, hazard) to get the most efficient path
-            paths.sort(key=lambda p: (p[0], p[1]))  # (cost, hazard)
-            cost, hazard, path = paths[0]
+        for coord, ((cost, hazard, _), label) in best_labels.items():
             best_paths[coord] = {
                 'move_cost': cost,
                 'hazard_damage': hazard,
-                'path': path
+                'path': self._rebuild_label_path(labels, label)
             }
         
         return best_paths
+
+    def _rebuild_label_path(self, labels, label):
+        """Walk parent pointers from a search label back to the start; returns the path start-first."""
+        path = []
+        while label is not None:
+            coord, label = labels[label]
+            path.append(coord)
+        path.reverse()
+        return path
     
     def _get_hazard_damage(self, coords, figure):
         """
         Calculate hazard damage for a figure moving into a square.
-        Checks all figures in the square for their hazard_damage property.
+        This is the summed hazard_damage of the square's figures, read from cell_hazards.
         """
-        total_damage = 0
-        for fig in self.cell_contents[coords.y][coords.x]:
-            total_damage += fig.hazard_damage
-        return total_damage
+        return self.cell_hazards[self.square_index(coords)]
 
     def squares_within_distance(self, pos1, impassible_types, distance):
+        if self.coords_in_bounds(pos1) and self._is_unobstructed(impassible_types):
+            return set(self._squares_within_octile_reach(pos1, distance))
+        if distance_transforms.available(self, pos1, distance):
+            return set(distance_transforms.squares_in_reach(self, pos1, figure_type_mask(impassible_types), distance))
         return set(self.bfs(pos1, impassible_types, max_distance=distance).keys())
 
     def squares_within_cone(self, origin, target, distance, impassible_types=None, angle_threshold = math.sqrt(2) / 2):
@@ -462,6 +936,10 @@ class Map:
         hypot = math.sqrt(dx**2 + dy**2)
         dx, dy = (dx / hypot, dy / hypot)  # Normalize the direction vector
 
+        if distance_transforms.available(self, origin, distance):
+            blocking_mask = figure_type_mask(impassible_types) if not self._is_unobstructed(impassible_types) else 0
+            return set(distance_transforms.squares_in_cone(self, origin, (dx, dy), blocking_mask, distance, angle_threshold))
+
         in_range = self.squares_within_distance(origin, impassible_types, distance)
         cone_squares = set()
         for square in in_range:
@@ -476,9 +954,226 @@ class Map:
         return cone_squares
 
     def distance_between(self, pos1, pos2, impassible_types=None):
-        visited = self.bfs(pos1, impassible_types, target=pos2)
-        return visited.get(pos2, float('inf'))
+        """Floored movement cost from pos1 to pos2 (inf if unreachable), always exact."""
+        if self.coords_in_bounds(pos1) and self.coords_in_bounds(pos2) and self._is_unobstructed(impassible_types):
+            return octile_distance(pos1, pos2)
+        # A field someone already paid for answers instantly; otherwise search towards pos2 only
+        fields = self.distance_cache.get(self.distance_cache.make_key(pos1, impassible_types), self.blocking_version(impassible_types))
+        if fields is not None:
+            return fields[1].get(pos2, float('inf'))
+        cost = self._astar(pos1, pos2, impassible_types)
+        return int(cost) if cost is not None else float('inf')
+
+    def find_path(self, start, goal, impassible_types=None):
+        """
+        A cheapest path from start to goal as a list of squares beginning with start (None if goal
+        cannot be reached); goal may be entered even if blocked. Long-range paths on large boards
+        come from the cluster hierarchy and may cost slightly more than the cheapest.
+        """
+        hierarchy = self._hierarchy_for(start, goal, impassible_types)
+        if hierarchy is not None:
+            found = hierarchy.find_path(start, goal)
+            if found is not None:
+                return found[1]
+        goal = self.intern_coords(goal)
+        visited, came_from = self._dijkstra(start, impassible_types, target=goal)
+        if goal not in visited:
+            return None
+        path = [goal]
+        while path[-1] in came_from:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return path
+
+    def _hierarchy_for(self, pos1, pos2, impassible_types):
+        """
+        The ClusterHierarchy for impassible_types when pos1 and pos2 are on a large board and
+        more than two clusters apart (closer queries stay with the exact searches), else None.
+        """
+        if max(self.width, self.height) < self.hierarchy_min_size:
+            return None
+        if not (self.coords_in_bounds(pos1) and self.coords_in_bounds(pos2)):
+            return None
+        if octile_distance(pos1, pos2) <= 2 * self.hierarchy_cluster_size:
+            return None
+        key = frozenset(impassible_types or ())
+        if key not in self.hierarchies:
+            self.hierarchies[key] = ClusterHierarchy(self, key, figure_type_mask(key), self.hierarchy_cluster_size)
+        return self.hierarchies[key]
+
+    def shared_distance(self, pos1, pos2, impassible_types=None):
+        """
+        distance_between, but a cache miss builds (and caches) pos1's whole distance field instead of
+        running a single A* search. Use it for queries that many callers repeat from the same pos1.
+        """
+        if self.coords_in_bounds(pos1) and self.coords_in_bounds(pos2) and self._is_unobstructed(impassible_types):
+            return octile_distance(pos1, pos2)
+        return self.get_distance_field(pos1, impassible_types).get(pos2, float('inf'))
+
+    def get_approach_field(self, goal, impassible_types=None):
+        """
+        For every square that can reach one of the squares around goal, the floored distance to the
+        nearest of them and all of them at that distance, as {square: (distance, (squares...))} with
+        the squares in neighbour order (horizontal/vertical, then diagonal). Distances are those of
+        distance_between (squares holding impassible figures are endpoints). Built by one search from
+        all the squares around goal at once and cached until a figure of an impassible type changes
+        squares; treat it as read-only.
+        """
+        key = self.approach_cache.make_key(goal, impassible_types)
+        version = self.blocking_version(impassible_types)
+        field = self.approach_cache.get(key, version)
+        if field is None:
+            sources = self.get_horver_neighbors(goal) + self.get_diag_neighbors(goal)
+            field = self._approach_search(sources, impassible_types)
+            self.approach_cache.put(key, version, field)
+        return field
+
+    def _approach_search(self, sources, impassible_types):
+        """
+        Multi-source search behind get_approach_field. A square keeps the cost from every source
+        within 1 of its cheapest one: the sources that tie after flooring are among them, and a
+        source within 1 at a square is also within 1 at the square before it on its cheapest path,
+        so pruning the rest loses no tie.
+        """
+        self.search_count += 1
+        blocking_mask = figure_type_mask(impassible_types)
+        cell_masks = self.cell_masks
+        horver_indexes = self.horver_indexes
+        diag_indexes = self.diag_indexes
+        source_indexes = [self.square_index(square) for square in sources]
+        cheapest = {}  # square index -> cost from its nearest source
+        reached = {}  # square index -> {source number: cost}, sources within 1 of cheapest
+        best = {}  # (square index, source number) -> lowest cost pushed
+        queue = [(0.0, number, index, number) for number, index in enumerate(source_indexes)]
+        counter = len(queue)
+
+        def relax(neighbor, source, new_cost):
+            nonlocal counter
+            if new_cost >= cheapest.get(neighbor, new_cost + 1) + 1:
+                return
+            if new_cost < best.get((neighbor, source), new_cost + 1):
+                best[neighbor, source] = new_cost
+                counter += 1
+                heapq.heappush(queue, (new_cost, counter, neighbor, source))
+
+        while queue:
+            cost, _, current, source = heapq.heappop(queue)
+            labels = reached.get(current)
+            if labels is None:
+                labels = reached[current] = {}
+                cheapest[current] = cost
+            elif source in labels or cost >= cheapest[current] + 1:
+                continue
+            labels[source] = cost
+            # Squares holding impassible figures are endpoints, except where a source starts
+            if current != source_indexes[source] and cell_masks[current] & blocking_mask:
+                continue
+            for neighbor in horver_indexes[current]:
+                if source not in reached.get(neighbor, ()):
+                    relax(neighbor, source, cost + 1)
+            for neighbor, corner1, corner2 in diag_indexes[current]:
+                if cell_masks[corner1] & blocking_mask and cell_masks[corner2] & blocking_mask:
+                    continue
+                if source not in reached.get(neighbor, ()):
+                    relax(neighbor, source, cost + 1.5)
+
+        squares = self.squares
+        field = {}
+        for index, labels in reached.items():
+            distance = int(cheapest[index])
+            field[squares[index]] = (distance, tuple(sources[number] for number in sorted(labels)
+                                                     if int(labels[number]) == distance))
+        return field
+
+    def _astar(self, start, goal, impassible_types=None):
+        """
+        Unfloored cheapest cost from start to goal (None if unreachable), with the same rules as the
+        distance fields: goal may be entered even if blocked. Expands in order of cost plus the open-board
+        cost to goal (max(dx, dy) + 0.5 * min(dx, dy)), which never overestimates, so the first time
+        goal is popped its cost is final. Runs on square indexes, like _dijkstra.
+        """
+        self.search_count += 1
+        if not self.coords_in_bounds(goal):
+            return None
+        blocking_mask = figure_type_mask(impassible_types)
+        cell_masks = self.cell_masks
+        horver_indexes = self.horver_indexes
+        diag_indexes = self.diag_indexes
+        width = self.width
+        goal_index = self.square_index(goal)
+        gx, gy = goal.x, goal.y
+
+        def heuristic(index):
+            y, x = divmod(index, width)
+            dx = abs(x - gx)
+            dy = abs(y - gy)
+            return dx + dy - 0.5 * min(dx, dy)
+
+        best = {}
+        closed = set()
+        counter = 0
+        # (estimate, -cost, counter, square index): among equal estimates, prefer the deeper square
+        if self.coords_in_bounds(start):
+            start_index = self.square_index(start)
+            queue = [(heuristic(start_index), 0.0, counter, start_index)]
+            best[start_index] = 0.0
+        else:
+            start_index = None
+            queue = []
+            for neighbor, step_cost in self._offboard_start_steps(start, blocking_mask):
+                if neighbor == goal_index or not cell_masks[neighbor] & blocking_mask:
+                    best[neighbor] = min(step_cost, best.get(neighbor, step_cost))
+                    counter += 1
+                    queue.append((step_cost + heuristic(neighbor), -step_cost, counter, neighbor))
+            heapq.heapify(queue)
+        while queue:
+            _, negative_cost, _, current = heapq.heappop(queue)
+            if current in closed:
+                continue
+            closed.add(current)
+            cost = -negative_cost
+            if current == goal_index:
+                return cost
+            if current != start_index and cell_masks[current] & blocking_mask:
+                continue
+            steps = [(neighbor, 1) for neighbor in horver_indexes[current]]
+            steps += [(neighbor, 1.5) for neighbor, corner1, corner2 in diag_indexes[current]
+                      if not (cell_masks[corner1] & blocking_mask and cell_masks[corner2] & blocking_mask)]
+            for neighbor, step_cost in steps:
+                if neighbor in closed:
+                    continue
+                if neighbor != goal_index and cell_masks[neighbor] & blocking_mask:
+                    continue
+                new_cost = cost + step_cost
+                if new_cost < best.get(neighbor, float('inf')):
+                    best[neighbor] = new_cost
+                    counter += 1
+                    heapq.heappush(queue, (new_cost + heuristic(neighbor), -new_cost, counter, neighbor))
+        return None
     
+    def distances_to_nearest(self, origin, figures, impassible_types=None):
+        """
+        distance_between from origin to the nearest of figures and to every figure tied with it,
+        as {figure: distance} in the order of figures. Farther figures are left out; an empty
+        dict means none of them can be reached. Uses one search from origin that stops as soon
+        as the nearest tie set is settled. Figures without a position are skipped.
+        """
+        figures = [figure for figure in figures if figure in self.positions]
+        if self.coords_in_bounds(origin) and self._is_unobstructed(impassible_types):
+            distances = {figure: octile_distance(origin, self.positions[figure]) for figure in figures}
+        else:
+            fields = self.distance_cache.get(self.distance_cache.make_key(origin, impassible_types), self.blocking_version(impassible_types))
+            field = fields[1] if fields is not None else None
+            if field is None:
+                visited, _ = self._dijkstra(origin, impassible_types, blocked_endpoints=True,
+                                            targets={self.positions[figure] for figure in figures})
+                field = {coord: int(cost) for coord, cost in visited.items()}
+            distances = {figure: field[self.positions[figure]] for figure in figures if self.positions[figure] in field}
+        if not distances:
+            return {}
+        nearest = min(distances.values())
+        return {figure: distance for figure, distance in distances.items() if distance == nearest}
+
     def move_away_squares(self, fleeing_figure, threat_figure):
         """
         Returns all squares where fleeing_figure can move while fleeing from threat_figure.
@@ -591,7 +1286,7 @@ class Map:
                 # Check for impassible terrain or figures
                 # you can move through an ally but not knockback through them
                 impassible_types = {FigureType.OBSTACLE, FigureType.HERO, FigureType.BOSS, FigureType.MINION}
-                if any(f.figure_type in impassible_types for f in self.cell_contents[new_y][new_x]):
+                if self._is_blocked(new_coords, impassible_types):
                     collided = True
             
             if not collided:
@@ -613,7 +1308,12 @@ class Map:
         damage_taken = target.take_damage(physical_damage, elemental_damage, damage_source=source, reduce_health=reduce_health)
         return damage_taken
 
+    def invalidate_derived_stats(self):
+        """Make every figure recompute its derived stats (Figure.move) on the next read."""
+        self.stats_epoch += 1
+
     def begin_hero_turn(self):
+        self.invalidate_derived_stats()
         self.events.trigger(GameEvent.HERO_TURN_START)
         self.heroes_activated = 0
         for hero_figure in self.get_figures_by_type(FigureType.HERO):
@@ -623,18 +1323,62 @@ class Map:
     def end_hero_turn(self):
         for hero_figure in self.get_figures_by_type(FigureType.HERO):
             self.events.trigger(GameEvent.END_FIGURE_ACTION, figure=hero_figure)
+        self.invalidate_derived_stats()
         self.events.trigger(GameEvent.HERO_TURN_END)
 
     def execute_boss_turn(self):
-        self.events.trigger(GameEvent.BOSS_TURN_START)
-        for figure in self.get_figures_by_type([FigureType.BOSS, FigureType.MINION]):
-            self.events.trigger(GameEvent.START_FIGURE_ACTION, figure=figure)
+        self.turn_context = TurnContext(self)
+        try:
+            self.invalidate_derived_stats()
+            self.events.trigger(GameEvent.BOSS_TURN_START)
+            for figure in self.get_figures_by_type([FigureType.BOSS, FigureType.MINION]):
+                self.events.trigger(GameEvent.START_FIGURE_ACTION, figure=figure)
 
-        self.encounter.perform_boss_turn()
+            self.encounter.perform_boss_turn()
 
-        for figure in self.get_figures_by_type([FigureType.BOSS, FigureType.MINION]):
-            self.events.trigger(GameEvent.END_FIGURE_ACTION, figure=figure)
-        self.events.trigger(GameEvent.BOSS_TURN_END)
+            for figure in self.get_figures_by_type([FigureType.BOSS, FigureType.MINION]):
+                self.events.trigger(GameEvent.END_FIGURE_ACTION, figure=figure)
+            self.invalidate_derived_stats()
+            self.events.trigger(GameEvent.BOSS_TURN_END)
+        finally:
+            self.turn_context = None
         
         # Increment round counter at the end of boss turn
-        self.current_round += 1
\ No newline at end of file
+        self.end_round()
+
+    def end_round(self):
+        """Dispose the round's listeners and start the next round."""
+        self.round_scope.dispose()
+        self.current_round += 1
+        self.round_scope = self.events.scope(f'round {self.current_round}')
+        if self.check_listener_growth:
+            self._report_listener_growth()
+
+    def _report_listener_growth(self):
+        """Debug check: print the events that gained listeners over the round that just ended."""
+        counts = self.events.listener_counts()
+        if self.listener_count_history:
+            previous = self.listener_count_history[-1]
+            grown = {event: count - previous.get(event, 0) for event, count in counts.items()
+                     if count > previous.get(event, 0)}
+            if grown:
+                print(f"DEBUG: listeners grew over round {self.current_round - 1} "
+                      f"({sum(previous.values())} -> {sum(counts.values())}): "
+                      + ", ".join(f"{event} +{growth}" for event, growth in grown.items()))
+        self.listener_count_history.append(counts)
+
+    def start_event_profiling(self):
+        """Time every event trigger and listener call from now on; returns the EventProfile being filled."""
+        return self.events.start_profiling()
+
+    def stop_event_profiling(self):
+        """Stop timing events; returns the EventProfile (to_json() / report() to dump it)."""
+        return self.events.stop_profiling()
+
+    def end_fight(self):
+        """Dispose every scoped listener (fight, round and figure scopes) once the fight is over."""
+        self.round_scope.dispose()
+        for scope in self.figure_scopes.values():
+            scope.dispose()
+        self.figure_scopes.clear()
+        self.fight_scope.dispose()
\ No newline at end of file
@@ -4,7 +4,7 @@ Simple test script to verify the GameEvent enum integration works correctly.
 This tests both enum and string event names to ensure backwards compatibility.
 """
 
-from events import EventManager
+from events import EventManager, EventProfile
 from game_events import GameEvent
 
 def test_event_enum():
@@ -51,6 +51,313 @@ def test_event_enum():
     
     print("✓ All event enum tests passed!")
 
+def test_listener_handles():
+    """Integer handles, deregistration during a trigger, and compaction of deregistered listeners."""
+    em = EventManager()
+    calls = []
+    handles = []
+
+    # A listener deregistered by an earlier one is not called; one registered mid-trigger is
+    def first():
+        calls.append('first')
+        em.deregister(GameEvent.DAMAGE_TAKEN, handles[0])
+        em.register("damage_taken", lambda: calls.append('late'))
+    first_handle = em.register(GameEvent.DAMAGE_TAKEN, first)
+    handles += [em.register(GameEvent.DAMAGE_TAKEN, lambda i=i: calls.append(i)) for i in range(4)]
+    assert all(isinstance(handle, int) for handle in handles)
+    assert len(set(handles + [first_handle])) == 5
+    assert em.listener_count(GameEvent.DAMAGE_TAKEN) == 5
+    em.trigger(GameEvent.DAMAGE_TAKEN)
+    assert calls == ['first', 1, 2, 3, 'late']
+    assert em.listener_count("damage_taken") == 5
+
+    # Deregistering twice, or with an unknown handle, is harmless
+    em.deregister(GameEvent.DAMAGE_TAKEN, handles[0])
+    em.deregister(GameEvent.DAMAGE_TAKEN, 12345)
+    assert em.listener_count() == 5
+
+    # Once most listeners are gone the list is compacted and the rest still fire in order
+    em.deregister(GameEvent.DAMAGE_TAKEN, first_handle)
+    em.deregister(GameEvent.DAMAGE_TAKEN, handles[1])
+    em.deregister(GameEvent.DAMAGE_TAKEN, handles[2])
+    assert len(em.listeners[GameEvent.DAMAGE_TAKEN]) == 2
+    assert all(cell[0] is not None for cell in em.listeners[GameEvent.DAMAGE_TAKEN])
+    calls.clear()
+    em.trigger("damage_taken")
+    assert calls == [3, 'late']
+
+    print("✓ Listener handles work!")
+
+def test_listener_scopes():
+    """Scopes deregister their listeners together; figure, round and fight scopes end with them."""
+    from map import Map
+    from figure import Figure, FigureType
+    from coords import Coords
+    from encounters.encounter_synthetic import EncounterSynthetic
+    from event_helpers import register_temporary_listener
+
+    em = EventManager()
+    scope = em.scope('card')
+    calls = []
+    scope.register(GameEvent.DAMAGE_TAKEN, lambda: calls.append('damage'))
+    handle = scope.register("hero_turn_end", lambda: calls.append('turn end'))
+    em.register(GameEvent.DAMAGE_TAKEN, lambda: calls.append('global'))
+    em.deregister(GameEvent.HERO_TURN_END, handle)
+    assert len(scope) == 1
+    scope.dispose()
+    em.trigger(GameEvent.DAMAGE_TAKEN)
+    em.trigger(GameEvent.HERO_TURN_END)
+    assert calls == ['global']
+    assert len(scope) == 0 and em.listener_count() == 1
+
+    map = Map(EncounterSynthetic(9, obstacle_density=0.0))
+    baseline = map.events.listener_count()
+
+    # Temporary listeners leave nothing behind once their cleanup event fires
+    register_temporary_listener(map, GameEvent.DAMAGE_TAKEN, lambda **kwargs: None, GameEvent.BOSS_TURN_END)
+    assert map.events.listener_count() == baseline + 2
+    map.events.trigger(GameEvent.BOSS_TURN_END)
+    assert map.events.listener_count() == baseline
+
+    # Figure-bound listeners go when the figure leaves the map, after its FIGURE_REMOVED listeners ran
+    minion = Figure("Minion", FigureType.MINION)
+    map.add_figure(minion, Coords(1, 1))
+    removed = []
+    map.figure_scope(minion).register(GameEvent.FIGURE_REMOVED, lambda figure, coords: removed.append(figure))
+    map.figure_scope(minion).register(GameEvent.DAMAGE_TAKEN, lambda **kwargs: None)
+    map.remove_figure(minion)
+    assert removed == [minion]
+    assert map.events.listener_count() == baseline
+
+    # A figure that already left the map gets the fight scope, so its listeners still end with the fight
+    assert map.figure_scope(minion) is map.fight_scope and minion not in map.figure_scopes
+    newcomer = Figure("Newcomer", FigureType.MINION)
+    assert map.figure_scope(newcomer) is not map.fight_scope  # not placed yet: its own scope
+    map.figure_scope(newcomer).register(GameEvent.DAMAGE_TAKEN, lambda **kwargs: None)
+    map.add_figure(newcomer, Coords(2, 2))
+    map.remove_figure(newcomer)
+    assert map.events.listener_count() == baseline
+
+    # Round listeners end with the round, fight listeners with the fight
+    map.round_scope.register(GameEvent.HERO_TURN_START, lambda: None)
+    map.end_round()
+    assert map.current_round == 2
+    assert map.events.listener_count() == baseline
+    fight_listeners = len(map.fight_scope)
+    assert fight_listeners > 0  # the condition listeners
+    map.end_fight()
+    assert map.events.listener_count() == baseline - fight_listeners
+
+    print("✓ Listener scopes work!")
+
+def test_keyed_listeners():
+    """Listeners keyed by subject or source figure only hear their figure's events, in registration order."""
+    em = EventManager()
+    calls = []
+    hero, minion, boss = object(), object(), object()
+
+    em.register(GameEvent.DAMAGE_TAKEN, lambda **kwargs: calls.append('global 1'))
+    em.register(GameEvent.DAMAGE_TAKEN, lambda **kwargs: calls.append('minion hit'), figure=minion)
+    hero_source = em.register(GameEvent.DAMAGE_TAKEN, lambda **kwargs: calls.append('hero hits'), source=hero)
+    em.register(GameEvent.DAMAGE_TAKEN, lambda **kwargs: calls.append('global 2'))
+    em.register("damage_taken", lambda **kwargs: calls.append('boss hit'), figure=boss)
+    em.register(GameEvent.HEALED, lambda **kwargs: calls.append('hero heals'), source=hero)
+    assert em.listener_count(GameEvent.DAMAGE_TAKEN) == 5
+
+    em.trigger(GameEvent.DAMAGE_TAKEN, figure=minion, damage_taken={}, damage_source=hero)
+    assert calls == ['global 1', 'minion hit', 'hero hits', 'global 2']
+    calls.clear()
+    em.trigger(GameEvent.DAMAGE_TAKEN, figure=boss, damage_taken={}, damage_source=minion)
+    assert calls == ['global 1', 'global 2', 'boss hit']
+    calls.clear()
+    em.trigger(GameEvent.HEALED, figure=minion, amount=1, source=hero)
+    assert calls == ['hero heals']
+
+    # Deregistered keyed listeners go quiet and their figure's entry is dropped
+    em.deregister(GameEvent.DAMAGE_TAKEN, hero_source)
+    assert hero not in em.source_listeners[GameEvent.DAMAGE_TAKEN]
+    calls.clear()
+    em.trigger(GameEvent.DAMAGE_TAKEN, figure=minion, damage_taken={}, damage_source=hero)
+    assert calls == ['global 1', 'minion hit', 'global 2']
+
+    # Only events with a source argument can be keyed by source, and a listener takes one key
+    for event, keys in ((GameEvent.GET_MOVE, {'source': hero}), (GameEvent.DAMAGE_TAKEN, {'figure': hero, 'source': hero})):
+        try:
+            em.register(event, print, **keys)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    print("✓ Keyed listeners work!")
+
+def test_event_profiling():
+    """Profiling counts triggers and listener calls while on and leaves trigger untouched while off."""
+    import json
+
+    em = EventManager()
+
+    def on_damage(**kwargs):
+        pass
+
+    heal = lambda **kwargs: em.trigger(GameEvent.HEALED, figure=None)
+    em.register(GameEvent.DAMAGE_TAKEN, on_damage)
+    em.register(GameEvent.DAMAGE_TAKEN, heal)
+    em.trigger(GameEvent.DAMAGE_TAKEN)  # not profiled
+
+    profile = em.start_profiling()
+    for _ in range(3):
+        em.trigger(GameEvent.DAMAGE_TAKEN, figure=None)
+    em.trigger("hero_turn_start")
+    assert em.stop_profiling() is profile
+    assert 'trigger' not in em.__dict__
+    em.trigger(GameEvent.DAMAGE_TAKEN)  # not profiled
+
+    assert profile.events['damage_taken'][0] == 3
+    assert profile.events['healed'][0] == 3
+    assert profile.events['hero_turn_start'][0] == 1
+    on_damage_name = EventProfile.listener_name(on_damage)
+    assert on_damage_name.endswith('test_event_profiling.<locals>.on_damage')
+    assert profile.listeners[on_damage_name][0] == 3
+    assert profile.listeners[EventProfile.listener_name(heal)][0] == 3
+    calls, total, longest = profile.events['damage_taken']
+    assert 0 <= longest <= total
+
+    report = json.loads(profile.to_json())
+    assert report['events']['damage_taken']['calls'] == 3
+    assert set(report['listeners'][on_damage_name]) == {'calls', 'total_ms', 'max_ms', 'mean_ms'}
+    assert 'damage_taken' in profile.report() and 'inclusive' in profile.report()
+    calls, healed_total, _ = profile.events['healed']
+    assert healed_total <= total  # the nested HEALED triggers are inside DAMAGE_TAKEN's time
+
+    print("✓ Event profiling works!")
+
+def test_derived_stat_cache():
+    """Figure.move asks the GET_MOVE listeners once and again only after something it depends on changed."""
+    from map import Map
+    from figure import Figure, FigureType
+    from coords import Coords
+    from game_conditions import Condition
+    from encounters.encounter_synthetic import EncounterSynthetic
+
+    map = Map(EncounterSynthetic(9, obstacle_density=0.0))
+    minion = Figure("Minion", FigureType.MINION, move=3)
+    map.add_figure(minion, Coords(1, 1))
+    reads = []
+    map.events.register(GameEvent.GET_MOVE, lambda figure, move_data: reads.append(figure))
+
+    assert minion.move == 3 and minion.move == 3
+    assert len(reads) == 1
+
+    # Conditions added, removed or replaced
+    minion.add_condition(Condition.SLOWED, 1)
+    assert minion.move == 1 and minion.move == 1
+    minion.remove_condition(Condition.SLOWED)
+    assert minion.move == 3
+    minion.conditions = {Condition.STUNNED.value: 1}
+    assert minion.move == 0
+    minion.conditions = {}
+    assert len(reads) == 4
+
+    # In-place changes to the conditions dict, as the tick-down and shield listeners make
+    minion.conditions[Condition.SLOWED.value] = 2
+    assert minion.move == 1
+    minion.conditions[Condition.SLOWED.value] -= 1
+    del minion.conditions[Condition.SLOWED.value]
+    assert minion.move == 3
+    minion.conditions.update({Condition.STUNNED.value: 1})
+    assert minion.move == 0
+    minion.conditions.pop(Condition.STUNNED.value)
+    assert minion.move == 3
+    minion.conditions.setdefault(Condition.STUNNED.value, 1)
+    assert minion.move == 0
+    minion.conditions.clear()
+    assert minion.move == 3
+    assert len(reads) == 10
+    import copy
+    twin = copy.deepcopy(minion)
+    assert type(twin.conditions) is type(minion.conditions) and twin.conditions.figure is twin
+    assert copy.copy(minion.conditions).figure is None
+
+    # Base value changes, turn boundaries, and new modifiers
+    minion.base_move = 5
+    assert minion.move == 5
+    map.begin_hero_turn()
+    assert minion.move == 5
+    assert len(reads) == 12
+    handle = map.events.register(GameEvent.GET_MOVE, lambda figure, move_data: move_data.update(value=move_data["value"] + 1), figure=minion)
+    assert minion.move == 6
+    map.events.deregister(GameEvent.GET_MOVE, handle)
+    assert minion.move == 5 and minion.move == 5
+    assert len(reads) == 14
+
+    print("✓ Derived stat cache works!")
+
+def test_shield_runs_before_later_listeners():
+    """Shielded absorbs damage before DAMAGE_TAKEN listeners registered later, however late the attacker spawned."""
+    import random
+    from map import Map
+    from coords import Coords
+    from heroes.hero import Hero
+    from heroes.hero_archetypes import hero_archetypes
+    from game_conditions import Condition
+    from encounters.encounter_across import EncounterAcross, CharrMinionType
+
+    random.seed(3)
+    encounter = EncounterAcross()
+    map = Map(encounter)
+    hero = Hero(hero_archetypes[0])
+    map.add_figure(hero.figure, Coords(5, 3), on_occupied='find_empty')
+    seen = []
+    map.events.register(GameEvent.DAMAGE_TAKEN, lambda figure, damage_taken, **kwargs: seen.append(dict(damage_taken)))
+
+    # A Blade Storm spawned mid-fight still cuts before the shield absorbs its damage
+    blade_storm = encounter.spawn_minion(map, CharrMinionType.BLADE_STORM, Coords(5, 5))
+    hero.figure.current_health = 1
+    hero.figure.add_condition(Condition.SHIELDED, 100)
+    hero.figure.take_damage(20, 0, damage_source=blade_storm)
+    assert Condition.BLEED.value in hero.figure.conditions
+    assert seen == [{'physical_damage_taken': 0, 'elemental_damage_taken': 0}]
+    assert hero.figure.current_health == 1
+
+    print("✓ Shield resolution does not depend on spawn order!")
+
+def test_ignite_arrows_stacks():
+    """Each Ignite Arrows played adds a splash to every marked Stalker's attacks, until the fight ends."""
+    import random
+    from map import Map
+    from coords import Coords
+    from heroes.hero import Hero
+    from heroes.hero_archetypes import hero_archetypes
+    from encounters.encounter_across import EncounterAcross, CharrMinionType
+    from encounters.card_effects_across import across_ignite_arrows
+    from figure import FigureType
+
+    random.seed(5)
+    map = Map(EncounterAcross())
+    stalker = [minion for minion in map.get_figures_by_type(FigureType.MINION)
+               if minion.get_effect('minion_type') == CharrMinionType.STALKER.value][0]
+    target, neighbour = Hero(hero_archetypes[0]), Hero(hero_archetypes[1])
+    map.add_figure(target.figure, Coords(5, 3))
+    map.add_figure(neighbour.figure, Coords(6, 3))
+    splashes = []
+    map.deal_damage = lambda source, figure, **kwargs: splashes.append((source, figure))
+
+    def attack():
+        splashes.clear()
+        map.events.trigger(GameEvent.DAMAGE_TAKEN, figure=target.figure, damage_taken={}, damage_source=stalker)
+        return splashes
+
+    assert attack() == []
+    across_ignite_arrows(map)
+    assert attack() == [(stalker, neighbour.figure)]
+    across_ignite_arrows(map)
+    assert attack() == [(stalker, neighbour.figure)] * 2
+    assert stalker.get_effect('power_counters') == 2
+    map.end_fight()
+    assert attack() == []
+
+    print("✓ Ignite Arrows splashes stack!")
+
 def test_event_documentation():
     """Test that all events have proper documentation."""
     for event in GameEvent:
@@ -61,5 +368,12 @@ def test_event_documentation():
 
 if __name__ == "__main__":
     test_event_enum()
+    test_listener_handles()
+    test_listener_scopes()
+    test_keyed_listeners()
+    test_event_profiling()
+    test_derived_stat_cache()
+    test_shield_runs_before_later_listeners()
+    test_ignite_arrows_stacks()
     test_event_documentation()
     print("🎉 All tests passed! The GameEvent enum integration is working correctly.")
\ No newline at end of file
@@ -0,0 +1,699 @@
+#!/usr/bin/env python3
+"""
+Tests for the Map distance/pathfinding engine (bfs, distance_between and the range queries built on it)
+and the board/figure bookkeeping it reads from.
+
+Run with:  python test_pathfinding.py
+"""
+
+from map import Map, octile_distance, FIGURE_TYPE_BITS
+from figure import Figure, FigureType
+from coords import Coords
+from encounters.encounter_base import EncounterBase
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class WallsEncounter(EncounterBase):
+    """Empty 11x11 board with an obstacle on each of the given (x, y) squares and lava on each of `lava`."""
+    def __init__(self, walls=(), lava=()):
+        super().__init__()
+        self.walls = walls
+        self.lava = lava
+
+    def setup_map(self, map):
+        for x, y in self.walls:
+            map.add_figure(Figure("Wall", FigureType.OBSTACLE), Coords(x, y))
+        for x, y in self.lava:
+            map.add_figure(Figure("LAVA", FigureType.MARKER, hazard_damage=1), Coords(x, y), on_occupied='colocate')
+
+    def get_deployment_zone(self):
+        return [(x, y) for x in range(11) for y in range(11)]
+
+
+def make_map(walls=(), lava=()):
+    return Map(WallsEncounter(walls, lava))
+
+
+def exhaustive_hazard_search(map, start, impassible, max_distance):
+    """Reference for bfs_with_hazards: enumerate every (square, parity, cost, hazard) state, keep the best per square."""
+    seen = set()
+    stack = [(start, False, 0, 0)]
+    best = {}
+    while stack:
+        state = stack.pop()
+        if state in seen:
+            continue
+        seen.add(state)
+        current, next_diag_expensive, cost, hazard = state
+        best[current] = min(best.get(current, (cost, hazard)), (cost, hazard))
+        for neighbor in map.get_horver_neighbors(current):
+            if not map._is_blocked(neighbor, impassible) and cost + 1 <= max_distance:
+                stack.append((neighbor, next_diag_expensive, cost + 1, hazard + map._get_hazard_damage(neighbor, None)))
+        for neighbor in map.get_diag_neighbors(current):
+            can_move, crossing_hazard = map.can_move_diagonal(current, neighbor, impassible)
+            diag_cost = 2 if next_diag_expensive else 1
+            if can_move and not map._is_blocked(neighbor, impassible) and cost + diag_cost <= max_distance:
+                stack.append((neighbor, not next_diag_expensive, cost + diag_cost,
+                              hazard + map._get_hazard_damage(neighbor, None) + crossing_hazard))
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_bfs_settles_minimal_cost():
+    """A wall forces a diagonal-then-straight detour; the cheapest route must win."""
+    map = make_map(walls=[(4, 3)])
+    costs = map.bfs(Coords(3, 3), {FigureType.OBSTACLE})
+    # (3,3) -> (4,2) diagonal 1.5 -> (5,2) 2.5 -> (6,2) 3.5, floored to 3
+    assert costs[Coords(6, 2)] == 3
+    assert map.distance_between(Coords(3, 3), Coords(6, 2), {FigureType.OBSTACLE}) == 3
+    assert Coords(4, 3) not in costs
+    print("✓ test_bfs_settles_minimal_cost")
+
+
+def test_bfs_diagonal_flooring():
+    """Open board: diagonals cost 1, 3, 4, 6 (1.5 per step, floored)."""
+    map = make_map()
+    costs = map.bfs(Coords(0, 0))
+    assert [costs[Coords(i, i)] for i in range(1, 5)] == [1, 3, 4, 6]
+    assert costs[Coords(5, 0)] == 5
+    print("✓ test_bfs_diagonal_flooring")
+
+
+def bfs_reach(map, origin, impassible, distance):
+    """Reference for bfs's max_distance: every square one step from a square whose unfloored cost is within distance."""
+    costs, _ = map._dijkstra(origin, impassible)
+    reach = {origin}
+    for square, cost in costs.items():
+        if cost > distance:
+            continue
+        for neighbor in map.get_horver_neighbors(square) + map.get_diag_neighbors(square):
+            if neighbor in costs and (neighbor in map.get_horver_neighbors(square) or map.can_move_diagonal(square, neighbor, impassible or set())[0]):
+                reach.add(neighbor)
+    return reach
+
+
+def test_bfs_max_distance():
+    """max_distance expands the squares within range and records the first ring beyond them, as it always has."""
+    map = make_map()
+    costs = map.bfs(Coords(5, 5), max_distance=1)
+    # The four straight neighbours (cost 1) are expanded; the diagonals (1.5) are recorded only
+    assert set(costs) == {Coords(x, y) for x in range(3, 8) for y in range(3, 8)} - {
+        Coords(3, 3), Coords(7, 3), Coords(3, 7), Coords(7, 7)}
+    assert costs[Coords(5, 7)] == 2 and costs[Coords(6, 7)] == 2
+    assert set(map.squares_within_distance(Coords(5, 5), None, 3)) == bfs_reach(map, Coords(5, 5), None, 3)
+
+    walled = make_map(walls=[(4, 3), (4, 4), (4, 5), (5, 5), (6, 7), (2, 8)])
+    for origin in [Coords(3, 4), Coords(0, 10), Coords(7, 6), Coords(-1, 4)]:
+        for distance in range(0, 6):
+            expected = bfs_reach(walled, origin, {FigureType.OBSTACLE}, distance)
+            assert set(walled.bfs(origin, {FigureType.OBSTACLE}, max_distance=distance)) == expected
+            if walled.coords_in_bounds(origin):
+                assert walled.squares_within_distance(origin, {FigureType.OBSTACLE}, distance) == expected
+    print("✓ test_bfs_max_distance")
+
+
+def test_bfs_target_is_enterable():
+    """The target square can be entered even when it holds an impassible figure."""
+    map = make_map(walls=[(5, 5)])
+    assert map.distance_between(Coords(2, 5), Coords(5, 5), {FigureType.OBSTACLE}) == 3
+    assert map.distance_between(Coords(2, 5), Coords(6, 5), {FigureType.OBSTACLE}) == 5
+    print("✓ test_bfs_target_is_enterable")
+
+
+def test_distance_field_matches_targeted_bfs():
+    """Every entry of a cached distance field equals a fresh targeted search to that square."""
+    map = make_map(walls=[(4, 3), (4, 4), (4, 5), (6, 7), (2, 8)])
+    map.add_figure(Figure("Minion", FigureType.MINION), Coords(5, 4))
+    impassible = {FigureType.OBSTACLE, FigureType.MINION}
+    origin = Coords(2, 4)
+    field = map.get_distance_field(origin, impassible)
+    for square in map.squares:
+        expected = map.bfs(origin, impassible, target=square).get(square, float('inf'))
+        assert field.get(square, float('inf')) == expected, f"{square}: {field.get(square)} != {expected}"
+    print("✓ test_distance_field_matches_targeted_bfs")
+
+
+def test_distance_cache_invalidated_by_moves():
+    """Repeated queries hit the cache; after figures are added, moved or removed the next query repairs the cached field."""
+    map = make_map(walls=[(10, 0)])  # an obstacle on the board keeps the closed-form fast path out of the way
+    impassible = {FigureType.OBSTACLE}
+    origin = Coords(0, 5)
+    assert map.shared_distance(origin, Coords(4, 5), impassible) == 4
+    hits = map.distance_cache.hits
+    assert map.shared_distance(origin, Coords(6, 5), impassible) == 6
+    assert map.distance_cache.hits == hits + 1
+
+    wall = Figure("Wall", FigureType.OBSTACLE)
+    for y in range(1, 11):
+        map.add_figure(Figure("Wall", FigureType.OBSTACLE), Coords(2, y))
+    map.add_figure(wall, Coords(2, 0))
+    assert map.shared_distance(origin, Coords(4, 5), impassible) == float('inf')
+    map.move_figure(wall, Coords(10, 10))
+    # (1,1) -> gap at (2,0) -> (3,0) -> (4,1) -> down to (4,5): 12.5, floored
+    assert map.shared_distance(origin, Coords(4, 5), impassible) == 12
+    map.remove_figure(map.get_square_contents(Coords(2, 5))[0])
+    assert map.shared_distance(origin, Coords(4, 5), impassible) == 4
+    assert map.distance_cache.stats()['repairs'] == 3  # once per read, however many changes came before it
+    print("✓ test_distance_cache_invalidated_by_moves")
+
+
+def test_repaired_fields_match_recomputation():
+    """Fields repaired when read after random adds, moves and removals equal a fresh search from the same origin."""
+    import contextlib
+    import io
+    import random
+    rng = random.Random(17)
+    impassible = {FigureType.OBSTACLE, FigureType.MINION}
+    repairs = 0
+    for _ in range(40):
+        map = make_map(walls={(rng.randrange(11), rng.randrange(11)) for _ in range(30)})
+        origins = [Coords(rng.randrange(11), rng.randrange(11)) for _ in range(3)]
+        for origin in origins:
+            map.get_cost_field(origin, impassible)
+        minions = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(15):
+                square = map.nearest_empty_square(Coords(rng.randrange(11), rng.randrange(11)))
+                if minions and rng.random() < 0.2:
+                    map.remove_figure(minions.pop(rng.randrange(len(minions))))
+                elif minions and rng.random() < 0.7:
+                    map.move_figure(rng.choice(minions), square)
+                else:
+                    minions.append(Figure("Minion", FigureType.MINION))
+                    map.add_figure(minions[-1], square)
+                for origin in origins[:rng.randrange(4)]:  # fields not read for a while catch up later
+                    expected, _ = map._dijkstra(origin, impassible, blocked_endpoints=True)
+                    assert map.get_cost_field(origin, impassible) == expected
+                    assert map.get_distance_field(origin, impassible) == {square: int(cost) for square, cost in expected.items()}
+        repairs += map.distance_cache.repairs
+    assert repairs > 0
+    print("✓ test_repaired_fields_match_recomputation")
+
+
+def test_distance_transform_backends_agree():
+    """The NumPy distance transforms give the same range and cone squares as the pure-Python searches."""
+    import random
+    import distance_transforms
+    from encounters.encounter_synthetic import EncounterSynthetic
+    if distance_transforms.np is None:
+        print("- test_distance_transform_backends_agree skipped (NumPy not installed)")
+        return
+    threshold, numpy = distance_transforms.MIN_WINDOW_CELLS, distance_transforms.np
+    distance_transforms.MIN_WINDOW_CELLS = 0  # use the arrays even for the smallest windows
+    rng = random.Random(20)
+    try:
+        for seed in range(12):
+            map = Map(EncounterSynthetic(rng.choice((11, 25)), obstacle_density=rng.choice((0, 0.15, 0.3)), seed=seed, minion_count=8))
+            for _ in range(10):
+                origin, target = rng.choice(map.squares), rng.choice(map.squares)
+                distance = rng.randrange(0, 10)
+                impassible = rng.choice((None, {FigureType.OBSTACLE}, {FigureType.OBSTACLE, FigureType.MINION}))
+                answers = []
+                for use_numpy in (True, False):
+                    distance_transforms.np = numpy if use_numpy else None  # None: as if NumPy were not installed
+                    answer = [map.squares_within_distance(origin, impassible, distance),
+                              map.get_squares_within_distance(origin, distance, impassible)]
+                    if target != origin:
+                        answer.append(map.squares_within_cone(origin, target, distance, impassible))
+                        answer.append(map.squares_within_cone(origin, target, distance, impassible, angle_threshold=0.3))
+                    answers.append(answer)
+                assert answers[0] == answers[1], (seed, origin, target, distance, impassible)
+    finally:
+        distance_transforms.MIN_WINDOW_CELLS, distance_transforms.np = threshold, numpy
+    print("✓ test_distance_transform_backends_agree")
+
+
+def test_figures_within_distance_single_pass():
+    """The radius query returns the same figures, in map order, as one distance check per figure."""
+    import random
+    rng = random.Random(3)
+    map = make_map(walls=[(rng.randrange(11), rng.randrange(11)) for _ in range(12)])
+    for _ in range(15):
+        map.add_figure(Figure("Minion", FigureType.MINION), Coords(rng.randrange(11), rng.randrange(11)), on_occupied='find_empty')
+    for origin in [Coords(0, 0), Coords(5, 5), Coords(9, 2)]:
+        for distance in range(0, 6):
+            expected = [f for f in map.figures if map.distance_between(origin, f.position) <= distance]
+            assert map.get_figures_within_distance(origin, distance) == expected
+    print("✓ test_figures_within_distance_single_pass")
+
+
+def test_squares_within_distance_single_traversal():
+    """The depth-limited traversal matches a distance check per board square, blockers included."""
+    map = make_map(walls=[(4, 3), (4, 4), (4, 5), (5, 5), (6, 7), (2, 8)])
+    impassible = {FigureType.OBSTACLE}
+    for origin in [Coords(3, 4), Coords(0, 10), Coords(7, 6)]:
+        per_square = {sq: map.bfs(origin, impassible, target=sq).get(sq, float('inf')) for sq in map.squares}
+        for distance in range(0, 5):
+            expected = [sq for sq in map.squares if per_square[sq] <= distance]
+            assert map.get_squares_within_distance(origin, distance, impassible) == expected
+    print("✓ test_squares_within_distance_single_traversal")
+
+
+def test_octile_fast_path_matches_bfs():
+    """Differential test: the closed-form distance equals the search on an unobstructed board."""
+    map = make_map(walls=[(3, 3), (7, 2)])  # obstacles do not block a hero-only impassible set
+    for origin in [Coords(0, 0), Coords(5, 5), Coords(10, 3), Coords(3, 4)]:
+        costs = map.bfs(origin)
+        for square in map.squares:
+            assert octile_distance(origin, square) == costs[square], f"{origin}->{square}"
+            assert map.distance_between(origin, square) == costs[square]
+            assert map.distance_between(origin, square, {FigureType.HERO}) == costs[square]
+        for distance in range(0, 7):
+            expected = [sq for sq in map.squares if costs[sq] <= distance]
+            assert map.get_squares_within_distance(origin, distance) == expected
+            assert map.squares_within_distance(origin, set(), distance) == bfs_reach(map, origin, set(), distance)
+    # An impassible figure on the board turns the fast path off
+    assert map.distance_between(Coords(2, 3), Coords(4, 3), {FigureType.OBSTACLE}) == 3
+    print("✓ test_octile_fast_path_matches_bfs")
+
+
+def test_bfs_with_hazards_parity_optimal():
+    """On lava-heavy boards the chosen (cost, hazard) per square matches an exhaustive search over diagonal parity."""
+    import random
+    impassible = {FigureType.OBSTACLE}
+    for seed in range(8):
+        rng = random.Random(seed)
+        squares = [(x, y) for x in range(11) for y in range(11) if (x, y) != (5, 5)]
+        walls = rng.sample(squares, 10)
+        lava = [sq for sq in squares if sq not in walls and rng.random() < 0.5]
+        map = make_map(walls=walls, lava=lava)
+        result = map.bfs_with_hazards(Coords(5, 5), impassible, max_distance=5)
+        expected = exhaustive_hazard_search(map, Coords(5, 5), impassible, 5)
+        assert set(result) == set(expected)
+        for square, (cost, hazard) in expected.items():
+            entry = result[square]
+            assert (entry['move_cost'], entry['hazard_damage']) == (cost, hazard), f"seed {seed} {square}"
+            assert entry['path'][0] == Coords(5, 5) and entry['path'][-1] == square
+    print("✓ test_bfs_with_hazards_parity_optimal")
+
+
+def test_hazard_and_type_grids_follow_figures():
+    """cell_hazards and cell_masks (and their hazard_grid / type_mask_grid rows) match the cell contents after adds, moves and removals."""
+    map = make_map(walls=[(2, 2)], lava=[(3, 3), (4, 4)])
+
+    def check():
+        for square in map.squares:
+            contents = map.get_square_contents(square)
+            assert map.cell_hazards[map.square_index(square)] == sum(f.hazard_damage for f in contents), square
+            mask = 0
+            for f in contents:
+                mask |= FIGURE_TYPE_BITS[f.figure_type]
+            assert map.cell_masks[map.square_index(square)] == mask, square
+            assert map.hazard_grid[square.y][square.x] == map.cell_hazards[map.square_index(square)]
+            assert map.type_mask_grid[square.y][square.x] == mask
+
+    check()
+    assert map.cell_hazards[3 * map.width + 3] == 1 and map._is_blocked(Coords(2, 2), {FigureType.OBSTACLE})
+    minion = Figure("Minion", FigureType.MINION)
+    map.add_figure(minion, Coords(3, 3), on_occupied='colocate')
+    extra_lava = Figure("LAVA", FigureType.MARKER, hazard_damage=1)
+    map.add_figure(extra_lava, Coords(3, 3), on_occupied='colocate')
+    check()
+    assert map.cell_hazards[3 * map.width + 3] == 2
+    assert len(map.hazard_grid) == map.height and list(map.hazard_grid)[3][3] == 2
+    try:
+        map.hazard_grid[3][3] = 0
+        assert False, "expected TypeError"
+    except TypeError:
+        pass
+    map.move_figure(minion, Coords(6, 6))
+    map.remove_figure(extra_lava)
+    check()
+    assert not map._is_blocked(Coords(3, 3), {FigureType.MINION}) and map._is_blocked(Coords(6, 6), {FigureType.MINION})
+    # crossing between the wall and the lava square takes the lava's damage
+    assert map.can_move_diagonal(Coords(2, 3), Coords(3, 2), {FigureType.OBSTACLE}) == (True, 1)
+    print("✓ test_hazard_and_type_grids_follow_figures")
+
+
+def test_neighbor_tables():
+    """Neighbour lookups return the board's own Coords objects, in the old order, clipped at the edges."""
+    map = make_map()
+    assert map.get_horver_neighbors(Coords(5, 5)) == (Coords(6, 5), Coords(4, 5), Coords(5, 6), Coords(5, 4))
+    assert map.get_diag_neighbors(Coords(0, 0)) == (Coords(1, 1),)
+    assert map.get_horver_neighbors(Coords(10, 10)) == (Coords(9, 10), Coords(10, 9))
+    for square in map.squares:
+        for neighbor in map.get_horver_neighbors(square) + map.get_diag_neighbors(square):
+            assert neighbor is map.squares[neighbor.y * map.width + neighbor.x]
+    # Off-board origins still get their in-bounds neighbours
+    assert map.get_horver_neighbors(Coords(-1, 3)) == (Coords(0, 3),)
+    assert map.get_horver_neighbors(Coords(5, 5)) is make_map().get_horver_neighbors(Coords(5, 5))
+    print("✓ test_neighbor_tables")
+
+
+def test_flat_board():
+    """The flat per-square lists back cell_contents, the index tables and snapshots."""
+    import contextlib
+    import io
+    from game_state_snapshot import GameStateSnapshot
+    from map import CellContentsView
+    map = make_map(walls=[(2, 2)], lava=[(3, 3)])
+    assert isinstance(map.cell_contents, CellContentsView) and len(map.cell_contents) == map.height
+    for square in map.squares:
+        index = map.square_index(square)
+        assert map.squares[index] is square
+        assert map.cell_contents[square.y][square.x] is map.cells[index] is map.get_square_contents(square)
+        horver = map.get_horver_neighbors(square)
+        assert tuple(map.squares[i] for i in map.horver_indexes[index]) == horver
+        for (neighbor, corner1, corner2), diagonal in zip(map.diag_indexes[index], map.get_diag_neighbors(square)):
+            assert map.squares[neighbor] is diagonal
+            assert {map.squares[corner1], map.squares[corner2]} == {Coords(diagonal.x, square.y), Coords(square.x, diagonal.y)}
+    assert [len(row) for row in map.cell_contents] == [map.width] * map.height
+    assert map.cell_contents[-1][0] is map.cells[(map.height - 1) * map.width]
+    row = map.cell_contents[4]  # a view: it reads the cells list, it does not copy the row
+    assert row.values is map.cells and row[-1] is map.cells[5 * map.width - 1]
+    assert list(row) == map.cells[4 * map.width:5 * map.width]
+    try:
+        row[map.width]
+        assert False, "expected IndexError"
+    except IndexError:
+        pass
+
+    minion = Figure("Minion", FigureType.MINION)
+    map.add_figure(minion, Coords(5, 5))
+    snapshot = GameStateSnapshot(map)
+    with contextlib.redirect_stdout(io.StringIO()):
+        map.move_figure(minion, Coords(7, 1))
+        snapshot.restore(map)
+    assert minion.position == Coords(5, 5) and map.cells[5 * map.width + 5] == [minion]
+    assert not map.cells[1 * map.width + 7] and map.cell_masks[1 * map.width + 7] == 0
+    print("✓ test_flat_board")
+
+
+def test_coords_flyweight():
+    """Coords are immutable value objects; the map stores its own interned instance for each square."""
+    import copy
+    import pickle
+    c = Coords(3, 4)
+    assert c == Coords(3, 4) and hash(c) == hash(Coords(3, 4)) and repr(c) == "Coords(3, 4)"
+    assert c != Coords(4, 3) and c != (3, 4)
+    try:
+        c.x = 5
+        assert False, "Coords should be immutable"
+    except AttributeError:
+        pass
+    assert copy.deepcopy(c) is c and pickle.loads(pickle.dumps(c)) == c
+
+    map = make_map()
+    minion = Figure("Minion", FigureType.MINION)
+    map.add_figure(minion, Coords(3, 4))
+    assert map.positions[minion] is map.intern_coords(Coords(3, 4)) is map.squares[4 * map.width + 3]
+    map.relocate_figure(minion, Coords(6, 6))
+    assert map.positions[minion] is map.squares[6 * map.width + 6]
+    assert map.intern_coords(Coords(-1, 2)) == Coords(-1, 2)
+    print("✓ test_coords_flyweight")
+
+
+def test_figure_indexes():
+    """Id, type and name lookups agree with a scan of map.figures, in add order, through removals."""
+    import random
+    rng = random.Random(5)
+    map = make_map(walls=[(0, 0), (1, 0)])
+    kinds = [("Minion", FigureType.MINION), ("Brute", FigureType.MINION), ("Boss", FigureType.BOSS), ("Rock", FigureType.OBSTACLE)]
+    for _ in range(30):
+        name, figure_type = rng.choice(kinds)
+        map.add_figure(Figure(name, figure_type), Coords(rng.randrange(11), rng.randrange(11)), on_occupied='find_empty')
+        if rng.random() < 0.3:
+            map.remove_figure(rng.choice(map.figures))
+    figures = map.figures
+    assert [f.id for f in figures] == sorted(f.id for f in figures)
+    for figure in figures:
+        assert map.get_figure_by_id(figure.id) is figure and map.has_figure(figure)
+    assert map.get_figure_by_id(-1) is None and not map.has_figure(Figure("Stray", FigureType.MINION))
+    for _, figure_type in kinds:
+        assert map.get_figures_by_type(figure_type) == [f for f in figures if f.figure_type == figure_type]
+    types = [FigureType.OBSTACLE, FigureType.MINION, FigureType.OBSTACLE]
+    assert map.get_figures_by_type(types) == [f for f in figures if f.figure_type in types]
+    for name, _ in kinds:
+        assert map.get_figures_by_name(name) == [f for f in figures if f.name == name]
+    assert map.get_figures_by_name("Nobody") == []
+    print("✓ test_figure_indexes")
+
+
+def test_add_figure_indexes_only_placed_figures():
+    """A figure joins the indexes once it has a square: displacement listeners and failed adds never see it."""
+    from game_events import GameEvent
+    map = make_map()
+    occupant = Figure("Minion", FigureType.MINION)
+    map.add_figure(occupant, Coords(5, 5))
+    seen = []
+    map.events.register(GameEvent.FIGURE_MOVED, lambda figure, old_coords, new_coords:
+                        seen.append(map.get_figures_within_distance(new_coords, 2)))
+    newcomer = Figure("Brute", FigureType.MINION)
+    map.add_figure(newcomer, Coords(5, 5), on_occupied='displace')
+    assert seen == [[occupant]]
+    assert map.get_figure_position(newcomer) == Coords(5, 5) and map.get_figure_position(occupant) != Coords(5, 5)
+    for coords in (Coords(5, 5), Coords(20, 5)):  # occupied, out of bounds
+        try:
+            map.add_figure(Figure("Stray", FigureType.MINION), coords)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    assert map.get_figures_by_name("Stray") == [] and len(map.figures) == 2
+    assert set(map.get_figures_within_distance(Coords(5, 5), 3)) == {occupant, newcomer}
+    assert set(map.get_figures_within_distance(Coords(-1, 5), 20)) == {occupant, newcomer}
+    print("✓ test_add_figure_indexes_only_placed_figures")
+
+
+def test_targeting_filter_index():
+    """Filtered type queries follow targeting_parameters through item edits, replacement and snapshots."""
+    import copy
+    from game_targeting import TargetingContext
+    from game_state_snapshot import GameStateSnapshot
+    map = make_map()
+    minions = [Figure(f"Minion {i}", FigureType.MINION) for i in range(4)]
+    for i, minion in enumerate(minions):
+        map.add_figure(minion, Coords(i, 0))
+    targetable = {TargetingContext.ENEMY_TARGETABLE: True}
+
+    def expected(filters):
+        return [f for f in map.figures if f.figure_type == FigureType.MINION
+                and all(f.targeting_parameters.get(c) == v for c, v in filters.items())]
+
+    snapshot = GameStateSnapshot(map)
+    minions[1].targeting_parameters[TargetingContext.ENEMY_TARGETABLE] = False
+    minions[2].targeting_parameters = {**minions[2].targeting_parameters, TargetingContext.TARGETING_PRIORITY: 2}
+    assert map.get_figures_by_type(FigureType.MINION, targetable) == [minions[0], minions[2], minions[3]] == expected(targetable)
+    both = {TargetingContext.ENEMY_TARGETABLE: True, TargetingContext.TARGETING_PRIORITY: 2}
+    assert map.get_figures_by_type(FigureType.MINION, both) == [minions[2]] == expected(both)
+    map.remove_figure(minions[3])
+    minions[3].targeting_parameters[TargetingContext.ENEMY_TARGETABLE] = True  # off the map: not indexed
+    assert map.get_figures_by_type(FigureType.MINION, targetable) == [minions[0], minions[2]]
+
+    snapshot.restore(map)
+    assert map.get_figures_by_type(FigureType.MINION, both) == []
+    assert map.get_figures_by_type(FigureType.MINION, targetable) == expected(targetable)
+
+    # Every dict method that changes the parameters keeps the index current
+    parameters = minions[2].targeting_parameters
+    mutations = [
+        lambda: parameters.pop(TargetingContext.ENEMY_TARGETABLE),
+        lambda: parameters.setdefault(TargetingContext.ENEMY_TARGETABLE, True),
+        lambda: parameters.__ior__({TargetingContext.ENEMY_TARGETABLE: False}),
+        lambda: parameters.popitem(),
+        lambda: parameters.clear(),
+        lambda: parameters.update({TargetingContext.ENEMY_TARGETABLE: True, TargetingContext.TARGETING_PRIORITY: 2}),
+    ]
+    for mutate in mutations:
+        mutate()
+        for filters in (targetable, both, {TargetingContext.TARGETING_PRIORITY: 0}):
+            assert map.get_figures_by_type(FigureType.MINION, filters) == expected(filters)
+    assert parameters.pop(TargetingContext.RENDERING_PRIORITY, None) is None
+    assert map.get_figures_by_type(FigureType.MINION, both) == [minions[2]]
+
+    # Copies keep the type; only a copy made along with its figure is bound to a figure
+    import pickle
+    parameters = minions[0].targeting_parameters
+    for duplicate in (copy.copy(parameters), parameters.copy(), copy.deepcopy(parameters), pickle.loads(pickle.dumps(parameters))):
+        assert type(duplicate) is type(parameters) and duplicate == parameters and duplicate.figure is None
+        duplicate[TargetingContext.ENEMY_TARGETABLE] = False  # detached: the map's index is untouched
+        assert map.get_figures_by_type(FigureType.MINION, targetable) == expected(targetable)
+    stray = Figure("Stray", FigureType.MINION)
+    stray_copy = copy.deepcopy(stray)
+    assert stray_copy.targeting_parameters.figure is stray_copy
+    print("✓ test_targeting_filter_index")
+
+
+def test_distances_to_nearest_matches_per_figure():
+    """The early-stopping multi-target search returns exactly the nearest tie set distance_between would."""
+    import random
+    rng = random.Random(11)
+    for trial in range(40):
+        map = make_map(walls={(rng.randrange(11), rng.randrange(11)) for _ in range(rng.choice([0, 15, 35]))})
+        targets = []
+        for _ in range(rng.randint(1, 5)):
+            target = Figure("Target", FigureType.MINION)
+            map.add_figure(target, Coords(rng.randrange(11), rng.randrange(11)), on_occupied='find_empty')
+            targets.append(target)
+        origin = Coords(rng.randrange(11), rng.randrange(11))
+        impassible = rng.choice([{FigureType.OBSTACLE}, {FigureType.OBSTACLE, FigureType.MINION}, {FigureType.HERO}])
+        per_figure = {t: map.distance_between(origin, t.position, impassible) for t in targets}
+        nearest = min(per_figure.values())
+        expected = {t: d for t, d in per_figure.items() if d == nearest and d != float('inf')}
+        map.distance_cache.clear()  # exercise the search rather than the cached field
+        result = map.distances_to_nearest(origin, targets, impassible)
+        assert result == expected and list(result) == list(expected), f"trial {trial}"
+    print("✓ test_distances_to_nearest_matches_per_figure")
+
+
+def test_approach_field_matches_distance_between():
+    """The approach field names the squares around the goal nearest to each square, ties included, as distance_between does."""
+    import random
+    rng = random.Random(11)
+    for _ in range(5):
+        map = make_map(walls={(rng.randrange(11), rng.randrange(11)) for _ in range(25)})
+        goal = map.squares[rng.randrange(121)]
+        impassible = {FigureType.OBSTACLE}
+        around = map.get_horver_neighbors(goal) + map.get_diag_neighbors(goal)
+        field = map.get_approach_field(goal, impassible)
+        for square in map.squares:
+            distances = [map.distance_between(square, near, impassible) for near in around]
+            nearest = min(distances)
+            if nearest == float('inf'):
+                assert square not in field
+            else:
+                assert field[square] == (nearest, tuple(near for near, d in zip(around, distances) if d == nearest))
+    print("✓ test_approach_field_matches_distance_between")
+
+
+def test_enemy_moves_share_fields():
+    """Enemies chasing the same target reuse its approach field; moving enemies does not invalidate it."""
+    import contextlib
+    import io
+    from encounters.enemy_ai import make_enemy_move
+    map = make_map(walls=[(5, y) for y in range(2, 9)])
+    target = Figure("Target", FigureType.BOSS)
+    map.add_figure(target, Coords(8, 5))
+    impassible = {FigureType.OBSTACLE, FigureType.BOSS}
+    chasers = [Figure(f"Chaser {i}", FigureType.MINION, move=3) for i in range(4)]
+    starts = [Coords(1, 2 * i + 2) for i in range(4)]
+    for chaser, start in zip(chasers, starts):
+        map.add_figure(chaser, start)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for chaser in chasers:
+            make_enemy_move(map, chaser, target, impassible_types=impassible)
+    assert map.approach_cache.misses == 1
+    for chaser, start in zip(chasers, starts):
+        assert chaser.position != start and map.distance_between(start, chaser.position, impassible) <= 3
+    print("✓ test_enemy_moves_share_fields")
+
+
+def test_turn_context():
+    """The shared boss-turn context gives the same answers as the map and drops area answers on moves."""
+    import random
+    from turn_context import TurnContext
+    rng = random.Random(2)
+    map = make_map(walls={(rng.randrange(11), rng.randrange(11)) for _ in range(25)})
+    targets = []
+    for _ in range(4):
+        target = Figure("Target", FigureType.BOSS)
+        map.add_figure(target, Coords(rng.randrange(11), rng.randrange(11)), on_occupied='find_empty')
+        targets.append(target)
+    context = TurnContext(map)
+    impassible = {FigureType.OBSTACLE, FigureType.BOSS}
+    for origin in map.squares[::7]:
+        assert context.nearest_figures(origin, targets, impassible) == map.distances_to_nearest(origin, targets, impassible)
+    searches = context.searches()
+    for origin in map.squares[::5]:
+        context.nearest_figures(origin, targets, impassible)
+    assert context.searches() == searches  # every target's field is already cached
+
+    origin = targets[0].position
+    assert context.figures_within_distance(origin, 2) == map.get_figures_within_distance(origin, 2)
+    mover = Figure("Mover", FigureType.MINION)
+    map.add_figure(mover, origin, on_occupied='find_empty')
+    assert mover in context.figures_within_distance(origin, 2)
+    map.move_figure(mover, Coords(10, 10) if origin.x < 6 else Coords(0, 0))
+    assert context.figures_within_distance(origin, 2) == map.get_figures_within_distance(origin, 2)
+    print("✓ test_turn_context")
+
+
+def test_astar_matches_distance_field():
+    """Point-to-point A* agrees with the full distance field, blocked endpoints and unreachable squares included."""
+    import random
+    rng = random.Random(8)
+    for trial in range(6):
+        map = make_map(walls={(rng.randrange(11), rng.randrange(11)) for _ in range(rng.choice([20, 40]))})
+        map.add_figure(Figure("Minion", FigureType.MINION), Coords(rng.randrange(11), rng.randrange(11)), on_occupied='find_empty')
+        impassible = rng.choice([{FigureType.OBSTACLE}, {FigureType.OBSTACLE, FigureType.MINION}])
+        for origin in rng.sample(map.squares, 4):
+            field = map.get_distance_field(origin, impassible)
+            map.distance_cache.clear()
+            for square in map.squares:
+                assert map.distance_between(origin, square, impassible) == field.get(square, float('inf')), f"{origin}->{square}"
+    print("✓ test_astar_matches_distance_field")
+
+
+def test_hierarchical_paths_on_large_boards():
+    """Long-range paths on large boards come from the cluster hierarchy: valid and near-optimal, while
+    distance_between stays exact, and figure moves patch the hierarchy to the same state as a rebuild."""
+    import contextlib
+    import io
+    import random
+    from encounters.encounter_synthetic import EncounterSynthetic
+    from hierarchical_pathfinding import ClusterHierarchy
+    from map import figure_type_mask
+    map = Map(EncounterSynthetic(70, obstacle_density=0.05, layout='rooms', minion_count=20))
+    impassible = {FigureType.OBSTACLE, FigureType.MINION}
+    rng = random.Random(18)
+    minions = map.get_figures_by_type(FigureType.MINION)
+    for _ in range(20):
+        start, goal = rng.choice(map.squares), rng.choice(map.squares)
+        exact = map._astar(start, goal, impassible)
+        distance = map.distance_between(start, goal, impassible)
+        path = map.find_path(start, goal, impassible)
+        if exact is None:
+            assert distance == float('inf') and path is None
+            continue
+        assert distance == int(exact)
+        assert path[0] == start and path[-1] == goal
+        for a, b in zip(path, path[1:]):
+            assert max(abs(a.x - b.x), abs(a.y - b.y)) == 1
+            assert b == goal or not map._is_blocked(b, impassible)
+            if a.x != b.x and a.y != b.y:
+                assert map.can_move_diagonal(a, b, impassible)[0]
+        cost = sum(1.5 if a.x != b.x and a.y != b.y else 1 for a, b in zip(path, path[1:]))
+        assert exact <= cost <= 1.25 * exact + 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            map.move_figure(rng.choice(minions), map.nearest_empty_square(rng.choice(map.squares)))
+    hierarchy = map.hierarchies[frozenset(impassible)]
+    hierarchy._refresh()
+    rebuilt = ClusterHierarchy(map, impassible, figure_type_mask(impassible))
+    rebuilt.rebuild()
+    assert hierarchy.borders == rebuilt.borders and hierarchy.crossings == rebuilt.crossings
+    assert len(map.hierarchies) == 1 and not make_map().hierarchies
+    print("✓ test_hierarchical_paths_on_large_boards")
+
+
+if __name__ == "__main__":
+    test_bfs_settles_minimal_cost()
+    test_bfs_diagonal_flooring()
+    test_bfs_max_distance()
+    test_bfs_target_is_enterable()
+    test_distance_field_matches_targeted_bfs()
+    test_distance_cache_invalidated_by_moves()
+    test_repaired_fields_match_recomputation()
+    test_distance_transform_backends_agree()
+    test_figures_within_distance_single_pass()
+    test_squares_within_distance_single_traversal()
+    test_octile_fast_path_matches_bfs()
+    test_bfs_with_hazards_parity_optimal()
+    test_hazard_and_type_grids_follow_figures()
+    test_neighbor_tables()
+    test_flat_board()
+    test_coords_flyweight()
+    test_figure_indexes()
+    test_add_figure_indexes_only_placed_figures()
+    test_targeting_filter_index()
+    test_distances_to_nearest_matches_per_figure()
+    test_approach_field_matches_distance_between()
+    test_enemy_moves_share_fields()
+    test_turn_context()
+    test_astar_matches_distance_field()
+    test_hierarchical_paths_on_large_boards()
+    print("\n🎉 All pathfinding tests passed!")
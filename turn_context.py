@@ -0,0 +1,68 @@
+"""Spatial queries shared by everything that acts during one boss turn."""
+
+from figure import FigureType
+
+
+class TurnContext:
+    """
+    Created by Map.execute_boss_turn and reachable as map.turn_context while the turn runs.
+    Card effects and minion activations ask it for distances, nearest targets and area
+    membership instead of each starting its own search. Answers are filled in lazily and
+    dropped when a figure is added, removed or moved; distance fields live in the map's
+    distance cache, which only drops them when a blocking figure moves.
+    """
+    def __init__(self, map, shared=True):
+        self.map = map
+        self.shared = shared
+        self.first_search = map.search_count
+        self.version = map.version
+        self.figures_in_range = {}  # (coords, distance) -> figures within that distance, at self.version
+
+    def searches(self):
+        """Path searches the map has run since this context was created."""
+        return self.map.search_count - self.first_search
+
+    def _check_version(self):
+        if self.map.version != self.version:
+            self.version = self.map.version
+            self.figures_in_range.clear()
+
+    def distance_field(self, origin, impassible_types=None):
+        return self.map.get_distance_field(origin, impassible_types)
+
+    def nearest_figures(self, origin, figures, impassible_types=None):
+        """
+        Same answer as Map.distances_to_nearest. While shared, distances are read from each
+        figure's own distance field (distances are symmetric), so enemies looking for the
+        nearest hero all reuse the same few hero fields.
+        """
+        if not self.shared:
+            return self.map.distances_to_nearest(origin, figures, impassible_types)
+        positions = self.map.positions
+        distances = {figure: self.map.shared_distance(positions[figure], origin, impassible_types)
+                     for figure in figures if figure in positions}
+        reachable = [distance for distance in distances.values() if distance != float('inf')]
+        if not reachable:
+            return {}
+        nearest = min(reachable)
+        return {figure: distance for figure, distance in distances.items() if distance == nearest}
+
+    def figures_within_distance(self, coords, distance):
+        """Map.get_figures_within_distance, remembered until a figure moves."""
+        if not self.shared:
+            return self.map.get_figures_within_distance(coords, distance)
+        self._check_version()
+        key = (coords, distance)
+        if key not in self.figures_in_range:
+            self.figures_in_range[key] = self.map.get_figures_within_distance(coords, distance)
+        return list(self.figures_in_range[key])
+
+    def adjacent_heroes(self, coords):
+        """Heroes on the squares around coords, in map order."""
+        return [figure for figure in self.figures_within_distance(coords, 1)
+                if figure.figure_type == FigureType.HERO and self.map.positions[figure] != coords]
+
+
+def get_turn_context(map):
+    """The running boss turn's context, or a throwaway one outside a boss turn."""
+    return map.turn_context or TurnContext(map, shared=False)